@@ -0,0 +1,306 @@
+"""Бенчмарк разбора страниц kadrovik.uz на записанных HTML-снимках (benchmarks/fixtures).
+
+Сеть не используется. Для каждой функции извлечения и каждого backend'а BeautifulSoup
+выводятся задержка на страницу (среднее и p95), пиковый объём выделенной памяти и
+пропускная способность (страниц/сек).
+
+    python benchmarks/bench_parser.py                           # html.parser и lxml
+    python benchmarks/bench_parser.py --save baseline.json      # сохранить результаты
+    python benchmarks/bench_parser.py --compare baseline.json   # сравнить, код 1 при регрессии
+    python benchmarks/bench_parser.py --e2e                     # через fetch_* с подменённой сетью
+    python benchmarks/bench_parser.py --legacy                  # рядом — прежние функции (legacy_extractors)
+    python benchmarks/bench_parser.py --stream                  # статьи: потоковый разбор против дерева
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+
+from aiohttp import web
+import kadrovik_parser
+import parser
+from config import ARTICLE_MAX_BYTES, ARTICLE_STREAM_CHUNK, ARTICLE_STREAM_DRAIN
+from utils import helpers, http_client, pagination
+
+BASE_URL = "https://kadrovik.uz/"
+
+# (название, файл снимка, функция извлечения(html, features))
+CASES = [
+    ("latest: posts-list", "homepage.html", lambda html, features: kadrovik_parser.extract_latest_articles(html, BASE_URL, 10, features)),
+    ("latest: fallback", "homepage_new.html", lambda html, features: kadrovik_parser.extract_latest_articles(html, BASE_URL, 10, features)),
+    ("search", "search.html", lambda html, features: kadrovik_parser.extract_search_results(html, BASE_URL, 10, features)),
+    ("topics", "homepage.html", lambda html, features: kadrovik_parser.extract_topics(html, BASE_URL, features)),
+    ("topic articles", "topic.html", lambda html, features: kadrovik_parser.extract_topic_articles(html, BASE_URL, features)),
+    ("article: small", "article_small.html", lambda html, features: kadrovik_parser.extract_article_content(html, features)),
+    ("article: medium", "article_medium.html", lambda html, features: kadrovik_parser.extract_article_content(html, features)),
+    ("article: large", "article_large.html", lambda html, features: kadrovik_parser.extract_article_content(html, features)),
+]
+
+def legacy_cases():
+    """Те же случаи для прежних функций извлечения (select/find по каждому полю)"""
+    import legacy_extractors as legacy
+    return [
+        ("latest: posts-list", "homepage.html", lambda html, features: legacy.extract_latest_articles(html, BASE_URL, 10, features)),
+        ("latest: fallback", "homepage_new.html", lambda html, features: legacy.extract_latest_articles(html, BASE_URL, 10, features)),
+        ("search", "search.html", lambda html, features: legacy.extract_search_results(html, BASE_URL, 10, features)),
+        ("topics", "homepage.html", lambda html, features: legacy.extract_topics(html, BASE_URL, features)),
+        ("topic articles", "topic.html", lambda html, features: legacy.extract_topic_articles(html, BASE_URL, features)),
+        ("article: small", "article_small.html", lambda html, features: legacy.extract_article_content(html, features)),
+        ("article: medium", "article_medium.html", lambda html, features: legacy.extract_article_content(html, features)),
+        ("article: large", "article_large.html", lambda html, features: legacy.extract_article_content(html, features)),
+    ]
+
+def load_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+def measure(func, html, features, iterations):
+    for _ in range(2):
+        func(html, features)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(html, features)
+        timings.append(time.perf_counter() - start)
+    # Память меряем отдельным прогоном, чтобы трассировка не искажала время
+    tracemalloc.start()
+    func(html, features)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+        "peak_kib": peak / 1024,
+        "pages_per_sec": len(timings) / sum(timings)
+    }
+
+def run_extract(backends, iterations, cases=CASES, suffix=""):
+    results = {}
+    print(f"{'случай':<20} {'backend':<12} {'KiB':>7} {'сред., мс':>10} {'p95, мс':>9} {'пам., KiB':>10} {'стр/сек':>9}")
+    for name, fixture, func in cases:
+        name += suffix
+        html = load_fixture(fixture)
+        size_kib = len(html.encode("utf-8")) / 1024
+        for backend in backends:
+            stats = measure(func, html, backend, iterations)
+            results[f"{name} [{backend}]"] = stats
+            print(f"{name:<20} {backend:<12} {size_kib:>7.0f} {stats['mean_ms']:>10.2f} {stats['p95_ms']:>9.2f} "
+                  f"{stats['peak_kib']:>10.0f} {stats['pages_per_sec']:>9.1f}")
+    return results
+
+async def run_e2e(iterations):
+    """Полный путь fetch_* (пул разбора, кэши, индекс) с подменённой загрузкой страниц"""
+    pages = {
+        BASE_URL: load_fixture("homepage.html"),
+        pagination.search_url("отпуск"): load_fixture("search.html"),
+        f"{BASE_URL}group/topic-1": load_fixture("topic.html"),
+        f"{BASE_URL}publish/doc/large": load_fixture("article_large.html"),
+    }
+
+    async def fake_fetch_text(url, timeout):
+        return pages[url]
+
+    async def fake_fetch_conditional(url, timeout, etag=None, last_modified=None):
+        return 200, pages[url], None, None
+
+    async def fake_fetch_streaming(url, timeout, sink, etag=None, last_modified=None, max_bytes=None, chunk_size=16384, drain_bytes=0):
+        raw = pages[url].encode("utf-8")
+        read = stream_into(sink, raw, chunk_size)
+        return 200, None, None, read, False
+
+    parser.fetch_text = fake_fetch_text
+    parser.fetch_conditional = fake_fetch_conditional
+    parser.fetch_streaming = fake_fetch_streaming
+    helpers.fetch_text = fake_fetch_text
+    pagination.fetch_text = fake_fetch_text
+    # Каждый вызов должен разбирать статью заново, а не брать её из кэша
+    parser.ARTICLE_CACHE_FRESH = -1
+
+    # Настоящий fetch_streaming через локальный сервер: сжатый и несжатый ответ с Content-Length
+    article = pages[f"{BASE_URL}publish/doc/large"].encode("utf-8")
+    runner, wire_url = await serve_article(article)
+    wire_reads = {}
+
+    def wire_call(encoding):
+        async def call():
+            _, _, _, read, _ = await http_client.fetch_streaming(
+                f"{wire_url}/{encoding}/publish/doc/large", 10, kadrovik_parser.StreamingArticleExtractor(),
+                max_bytes=ARTICLE_MAX_BYTES, chunk_size=ARTICLE_STREAM_CHUNK, drain_bytes=ARTICLE_STREAM_DRAIN
+            )
+            wire_reads[encoding] = read
+        return call
+
+    calls = [
+        ("fetch_articles_from_site", lambda: parser.fetch_articles_from_site(lang="ru", limit=10)),
+        ("fetch_articles_from_site(q)", lambda: parser.fetch_articles_from_site("отпуск", "ru")),
+        ("fetch_topics", helpers.fetch_topics),
+        ("fetch_topic_articles", lambda: helpers.fetch_topic_articles(f"{BASE_URL}group/topic-1")),
+        ("fetch_article_content", lambda: parser.fetch_article_content(f"{BASE_URL}publish/doc/large")),
+        ("fetch_streaming (identity)", wire_call("identity")),
+        ("fetch_streaming (gzip)", wire_call("gzip")),
+    ]
+    results = {}
+    print(f"{'вызов':<30} {'сред., мс':>10} {'p95, мс':>9} {'стр/сек':>9}")
+    try:
+        await measure_calls(calls, iterations, results)
+    finally:
+        await http_client.close_session()
+        await runner.cleanup()
+    # Хвост после статьи короче ARTICLE_STREAM_DRAIN: несжатый дочитывается, сжатый — нет
+    for encoding, read in wire_reads.items():
+        print(f"{encoding}: прочитано {read / 1024:.0f} из {len(article) / 1024:.0f} KiB, "
+              f"хвост дочитан: {'да' if read >= len(article) else 'нет'}")
+    return results
+
+async def measure_calls(calls, iterations, results):
+    for name, call in calls:
+        await call()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await call()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[name] = {
+            "mean_ms": statistics.mean(timings) * 1000,
+            "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+            "pages_per_sec": len(timings) / sum(timings)
+        }
+        print(f"{name:<30} {results[name]['mean_ms']:>10.2f} {results[name]['p95_ms']:>9.2f} "
+              f"{results[name]['pages_per_sec']:>9.1f}")
+
+async def serve_article(raw):
+    """Локальный сервер статьи: /identity/... как есть, /gzip/... со сжатием; у обоих есть Content-Length"""
+    compressed = gzip.compress(raw)
+
+    async def handle(request):
+        if request.match_info["encoding"] == "gzip":
+            return web.Response(body=compressed, content_type="text/html", charset="utf-8",
+                                headers={"Content-Encoding": "gzip"})
+        return web.Response(body=raw, content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/{encoding}/publish/doc/large", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def stream_into(sink, raw, chunk_size, on_chunk=None):
+    """Подаёт страницу кусками, как их отдаёт сеть; возвращает, сколько байт понадобилось прочитать"""
+    sink.begin("utf-8")
+    read = 0
+    for offset in range(0, len(raw), chunk_size):
+        chunk = raw[offset:offset + chunk_size]
+        read += len(chunk)
+        stop = sink.feed(chunk)
+        if on_chunk:
+            on_chunk(read)
+        if stop:
+            break
+    return read
+
+def run_stream(iterations, chunk_size):
+    """Статьи: потоковый разбор (StreamingArticleExtractor) против дерева BeautifulSoup на lxml.
+    Для потока — сколько байт прочитано до остановки и через сколько байт/мс готов первый абзац."""
+    from kadrovik_parser import StreamingArticleExtractor
+    results = {}
+    print(f"{'случай':<20} {'режим':<8} {'KiB':>7} {'прочит., KiB':>13} {'1-й абзац, KiB':>15} "
+          f"{'1-й абзац, мс':>14} {'сред., мс':>10} {'пам., KiB':>10}")
+    for name, fixture, _ in CASES:
+        if not name.startswith("article"):
+            continue
+        html = load_fixture(fixture)
+        raw = html.encode("utf-8")
+        size_kib = len(raw) / 1024
+
+        def streamed():
+            extractor = StreamingArticleExtractor()
+            stream_into(extractor, raw, chunk_size)
+            return extractor.finish()
+
+        assert streamed() == kadrovik_parser.extract_article_content(html, "lxml"), f"{name}: потоковый разбор расходится с деревом"
+        tree = measure(lambda html, features: kadrovik_parser.extract_article_content(html, features), html, "lxml", iterations)
+        stream = measure(lambda html, features: streamed(), html, None, iterations)
+
+        # Первый абзац: байты и время от начала ответа до первого закрытого блока статьи
+        extractor = StreamingArticleExtractor()
+        first = {}
+        start = time.perf_counter()
+
+        def on_chunk(read):
+            if "bytes" not in first and extractor.ready_blocks():
+                first["bytes"], first["ms"] = read, (time.perf_counter() - start) * 1000
+
+        read = stream_into(extractor, raw, chunk_size, on_chunk)
+        stream.update(read_kib=read / 1024, first_kib=first.get("bytes", read) / 1024, first_ms=first.get("ms", 0))
+        results[f"{name} [tree]"] = tree
+        results[f"{name} [stream]"] = stream
+        print(f"{name:<20} {'tree':<8} {size_kib:>7.0f} {size_kib:>13.0f} {'—':>15} {'—':>14} "
+              f"{tree['mean_ms']:>10.2f} {tree['peak_kib']:>10.0f}")
+        print(f"{name:<20} {'stream':<8} {size_kib:>7.0f} {stream['read_kib']:>13.0f} {stream['first_kib']:>15.0f} "
+              f"{stream['first_ms']:>14.2f} {stream['mean_ms']:>10.2f} {stream['peak_kib']:>10.0f}")
+    return results
+
+def compare(results, baseline_path, threshold):
+    """Сравнивает среднее время с сохранённым прогоном; True, если есть регрессия"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    regressed = False
+    print(f"\nСравнение с {baseline_path} (порог {threshold:.0%}):")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        delta = stats["mean_ms"] / baseline[name]["mean_ms"] - 1
+        mark = "РЕГРЕССИЯ" if delta > threshold else ""
+        regressed = regressed or delta > threshold
+        print(f"  {name:<36} {baseline[name]['mean_ms']:>8.2f} → {stats['mean_ms']:>8.2f} мс ({delta:+.0%}) {mark}")
+    return regressed
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк парсеров kadrovik.uz")
+    arg_parser.add_argument("--iterations", type=int, default=30)
+    arg_parser.add_argument("--backends", nargs="+", default=["html.parser", "lxml"])
+    arg_parser.add_argument("--e2e", action="store_true", help="замерить fetch_* целиком с подменённой сетью")
+    arg_parser.add_argument("--legacy", action="store_true", help="замерить и прежние функции извлечения")
+    arg_parser.add_argument("--stream", action="store_true", help="статьи: потоковый разбор против дерева")
+    arg_parser.add_argument("--chunk-size", type=int, default=16384, help="размер куска для --stream")
+    arg_parser.add_argument("--save", help="сохранить результаты в JSON")
+    arg_parser.add_argument("--compare", help="JSON с прошлым прогоном для сравнения")
+    arg_parser.add_argument("--threshold", type=float, default=0.2, help="допустимое замедление (0.2 = 20%%)")
+    args = arg_parser.parse_args()
+
+    if args.e2e:
+        # Кэш и индекс пишутся во временный каталог, а не рядом с ботом
+        os.chdir(tempfile.mkdtemp(prefix="kadrovik-bench-"))
+        results = asyncio.run(run_e2e(args.iterations))
+        from utils.parsing import shutdown_executor
+        shutdown_executor()
+    elif args.stream:
+        results = run_stream(args.iterations, args.chunk_size)
+    else:
+        results = run_extract(args.backends, args.iterations)
+        if args.legacy:
+            print()
+            results.update(run_extract(args.backends, args.iterations, legacy_cases(), " (legacy)"))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""Бенчмарк запуска бота: время импорта модулей и время до первого ответа /health.
+
+Сеть не используется. Профиль импорта снимается через `python -X importtime` в отдельных
+процессах; режим --serve запускает main.py в режиме webhook (без краулера и метрик)
+и замеряет время от старта процесса до первого ответа 200 от /health.
+
+    python benchmarks/bench_startup.py                 # профиль импорта main
+    python benchmarks/bench_startup.py --top 30        # больше модулей в списке
+    python benchmarks/bench_startup.py --serve         # время до готовности webhook-сервера
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def child_env(**extra):
+    env = dict(os.environ)
+    env.setdefault("BOT_TOKEN", "0:benchmark")
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    env.update(extra)
+    return env
+
+def import_profile(module, cwd):
+    """Собственное и суммарное время импорта каждого модуля (мкс) за один запуск"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=child_env(), capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - started
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall, profile
+
+def bench_imports(module, runs, top, cwd):
+    walls = []
+    self_times = defaultdict(list)
+    cumulative_times = defaultdict(list)
+    for _ in range(runs):
+        wall, profile = import_profile(module, cwd)
+        walls.append(wall)
+        for name, (self_us, cumulative_us) in profile.items():
+            self_times[name].append(self_us)
+            cumulative_times[name].append(cumulative_us)
+
+    print(f"import {module}: процесс целиком {statistics.median(walls) * 1000:.0f} мс (медиана из {runs})")
+    print(f"{'модуль':<50} {'своё, мс':>10} {'всего, мс':>10}")
+    ranked = sorted(cumulative_times, key=lambda name: statistics.median(cumulative_times[name]), reverse=True)
+    # Только модули верхнего уровня и модули бота: вложенные пакеты библиотек дублируют строки родителя
+    own = {path.stem for path in ROOT.glob("*.py")} | {"utils", "handlers"}
+    shown = [name for name in ranked if "." not in name or name.split(".")[0] in own][:top]
+    for name in shown:
+        print(f"{name:<50} {statistics.median(self_times[name]) / 1000:>10.1f} {statistics.median(cumulative_times[name]) / 1000:>10.1f}")
+
+def wait_for_health(url, process, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"main.py завершился с кодом {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=0.5) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} не ответил за {timeout} с")
+
+def bench_serve(runs, port, timeout):
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            env = child_env(
+                BOT_MODE="webhook", WEBHOOK_SECRET="benchmark", WEBHOOK_URL="",
+                WEBAPP_HOST="127.0.0.1", WEBAPP_PORT=str(port),
+                METRICS_ENABLED="0", CRAWLER_ENABLED="0", LOG_LEVEL="WARNING"
+            )
+            started = time.perf_counter()
+            process = subprocess.Popen([sys.executable, str(ROOT / "main.py")], cwd=workdir, env=env)
+            try:
+                wait_for_health(f"http://127.0.0.1:{port}/health", process, timeout)
+                times.append(time.perf_counter() - started)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+    # Первый запуск холодный; остальные используют снимок тёплого старта, сохранённый предыдущим
+    print(f"до первого /health 200: первый {times[0] * 1000:.0f} мс, "
+          f"медиана {statistics.median(times) * 1000:.0f} мс, макс {max(times) * 1000:.0f} мс ({runs} запусков)")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк запуска бота")
+    arg_parser.add_argument("--module", default="main", help="модуль для профиля импорта")
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--top", type=int, default=20, help="сколько модулей показать")
+    arg_parser.add_argument("--serve", action="store_true", help="замерить время до ответа /health")
+    arg_parser.add_argument("--port", type=int, default=8199)
+    arg_parser.add_argument("--timeout", type=float, default=30)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_imports(args.module, args.runs, args.top, workdir)
+    if args.serve:
+        bench_serve(args.runs, args.port, args.timeout)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
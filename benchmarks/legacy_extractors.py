@@ -0,0 +1,230 @@
+"""Прежние функции извлечения (BeautifulSoup: select/find по каждому полю) — эталон для bench_parser.py --legacy.
+
+Бот их не использует: страницы разбирает движок селекторов из kadrovik_parser.
+"""
+import logging
+from datetime import datetime
+from bs4 import BeautifulSoup, SoupStrainer
+from config import PARSER_FEATURES, MAX_ARTICLES
+
+logger = logging.getLogger(__name__)
+
+def extract_search_results(html, base_url, limit, features=PARSER_FEATURES):
+    """Извлекает результаты поиска из <ol class="results">"""
+    soup = BeautifulSoup(html, features, parse_only=SoupStrainer("ol", class_="results"))
+    articles = []
+    # Для поиска используем старые селекторы
+    results_list = soup.select("ol.results li")
+    if results_list:
+        logger.debug("Найдена страница поиска со старой структурой")
+        for li in results_list[:limit]:
+            a_tag = li.find('a')
+            span_date = li.find('span', class_='date')
+
+            url_link = a_tag['href'] if a_tag else ''
+            title = a_tag.get_text(strip=True) if a_tag else ''
+            date = span_date.get_text(strip=True) if span_date else ''
+
+            if a_tag:
+                a_tag.extract()
+            if span_date:
+                span_date.extract()
+
+            text_content = li.get_text(separator=' ', strip=True)
+
+            if not url_link.startswith("http"):
+                url_link = base_url.rstrip("/") + "/" + url_link.lstrip("/")
+
+            articles.append({
+                "title": title or "Без заголовка",
+                "content": text_content or "",
+                "date": date or datetime.now().isoformat(),
+                "emoji": "📰",
+                "url": url_link
+            })
+    return articles
+
+def extract_latest_articles(html, base_url, limit, features=PARSER_FEATURES):
+    """Извлекает последние статьи с главной страницы"""
+    # Для главной страницы парсим <ul class="posts-list">
+    logger.debug("Парсим главную страницу, ищем <ul class='posts-list'>")
+    soup = BeautifulSoup(html, features, parse_only=SoupStrainer("ul", class_="posts-list"))
+    articles = []
+    posts_list = soup.select("ul.posts-list li.post-card-wrapper, ul.posts-list li.post-card--horizontal-wrapper")
+    if posts_list:
+        logger.debug("Найдено %d статей в <ul class='posts-list'>", len(posts_list))
+        for item in posts_list[:limit]:
+            a_tag = item.find('a', href=True)
+            title_tag = item.find('h4', class_='post-card__title')
+            date_tag = item.find('time', class_='longread-post__time-published')
+
+            url_link = a_tag['href'] if a_tag else ''
+            title = title_tag.get_text(strip=True) if title_tag else 'Без заголовка'
+            date = date_tag.get_text(strip=True) if date_tag else datetime.now().strftime('%d.%m.%Y')
+
+            if not url_link.startswith("http"):
+                url_link = base_url.rstrip("/") + "/" + url_link.lstrip("/")
+
+            articles.append({
+                "title": title,
+                "content": "",  # Краткое описание не извлекаем, так как его нет в HTML
+                "date": date,
+                "emoji": "📰",
+                "url": url_link
+            })
+    
+    # Резервная логика для новой структуры сайта: нужна вся страница
+    if not articles:
+        soup = BeautifulSoup(html, features)
+        logger.info("Ищем статьи в новой структуре сайта")
+        article_links = []
+        potential_selectors = [
+            "a[href*='/publish/']",
+            "a[href*='/article/']",
+            ".article-link",
+            ".publication-link",
+            "article a",
+            ".content a[href]",
+            "main a[href]"
+        ]
+
+        for selector in potential_selectors:
+            links = soup.select(selector)
+            if links:
+                logger.debug("Найдены ссылки с селектором: %s (%d штук)", selector, len(links))
+                article_links.extend(links)
+                break
+
+        if not article_links:
+            all_links = soup.find_all('a', href=True)
+            article_links = [
+                link for link in all_links 
+                if any(keyword in link['href'] for keyword in ['/publish/', '/article/', '/news/'])
+                and not any(skip in link['href'] for skip in ['search', 'group', 'recent_publications'])
+            ]
+            logger.debug("Найдены общие ссылки на статьи: %d", len(article_links))
+
+        processed_urls = set()
+        for link in article_links[:limit*2]:
+            if len(articles) >= limit:
+                break
+
+            href = link.get('href', '')
+            if not href or href in processed_urls:
+                continue
+
+            if not href.startswith("http"):
+                href = base_url.rstrip("/") + "/" + href.lstrip("/")
+
+            processed_urls.add(href)
+
+            title = link.get_text(strip=True)
+            if not title:
+                continue
+
+            date = ""
+            parent = link.parent
+            if parent:
+                date_elem = parent.find('time') or parent.find(class_='date') or parent.find('span', string=lambda text: text and any(month in text for month in ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня']))
+                if date_elem:
+                    date = date_elem.get_text(strip=True)
+
+            content = ""
+            if parent:
+                text_nodes = parent.find_all(text=True)
+                content_parts = []
+                for text_node in text_nodes:
+                    text = text_node.strip()
+                    if text and text != title and len(text) > 10:
+                        content_parts.append(text)
+                content = ' '.join(content_parts[:2])
+
+            articles.append({
+                "title": title,
+                "content": content[:200] + "..." if len(content) > 200 else content,
+                "date": date or datetime.now().isoformat(),
+                "emoji": "📰",
+                "url": href
+            })
+
+        if not articles:
+            all_links = soup.find_all('a', href=True)[:5]
+            for i, link in enumerate(all_links):
+                logger.debug("%d. %s - %s", i + 1, link.get('href'), link.get_text(strip=True)[:50])
+    return articles
+
+def extract_article_content(html, features=PARSER_FEATURES):
+    """Извлекает заголовок, дату и текст статьи; content равен None, если блок с текстом не найден"""
+    soup = BeautifulSoup(html, features, parse_only=SoupStrainer(["h1", "time", "section"]))
+    
+    title = soup.find('h1').get_text(strip=True) if soup.find('h1') else "Без заголовка"
+    date_elem = soup.find('time', {'class': 'longread-post__time-published'})
+    date = date_elem['datetime'] if date_elem else ""
+    
+    content_block = soup.find('section', {'class': 'longread-block'})
+    if not content_block:
+        # Блока longread нет — разбираем страницу целиком и берём <body>
+        content_block = BeautifulSoup(html, features).find('body')
+    
+    if not content_block:
+        return {"title": title, "date": date, "content": None}
+    
+    elements = content_block.find_all(['p', 'strong'])
+    result = []
+    
+    for element in elements:
+        text = element.get_text(' ', strip=True)
+        if text:
+            if element.name == 'strong':
+                result.append(f"\n \n🔹 {text}\n")
+            else:
+                result.append(f"{text}")
+    
+    return {"title": title, "date": date, "content": ''.join(dict.fromkeys(result))}
+
+def extract_topics(html, base_url, features=PARSER_FEATURES):
+    """Извлекает список тем из <ul class='tax-code__list'>"""
+    soup = BeautifulSoup(html, features, parse_only=SoupStrainer("ul", class_="tax-code__list"))
+
+    topics = []
+    topic_list = soup.select("ul.tax-code__list li.tax-code__list-item a.tax-code__list-link")[:10]  # Ограничение до 10 тем
+    if topic_list:
+        logger.debug("Найдено %d тем в <ul class='tax-code__list'>", len(topic_list))
+        for item in topic_list:
+            url = item['href'] if item.get('href') else ''
+            title = item.get_text(strip=True) if item.get_text(strip=True) else 'Без названия'
+            
+            if not url.startswith("http"):
+                url = base_url.rstrip("/") + "/" + url.lstrip("/")
+            
+            topics.append({
+                "title": title,
+                "url": url
+            })
+    return topics
+
+def extract_topic_articles(html, base_url, features=PARSER_FEATURES):
+    """Извлекает статьи со страницы темы"""
+    soup = BeautifulSoup(html, features, parse_only=SoupStrainer("ul", class_="rec-selected__content-item"))
+
+    articles = []
+    posts_list = soup.select("ul.rec-selected__content-item li a.rec-block__info-post")
+    if posts_list:
+        logger.debug("Найдено %d статей в теме", len(posts_list))
+        for item in posts_list[:MAX_ARTICLES]:
+            title_tag = item.find('h3', class_='info-post__title-item')
+            url_link = item['href'] if item.get('href') else ''
+            title = title_tag.get_text(strip=True) if title_tag else 'Без заголовка'
+            date = datetime.now().strftime('%d.%m.%Y')
+
+            if not url_link.startswith("http"):
+                url_link = base_url.rstrip("/") + "/" + url_link.lstrip("/")
+
+            articles.append({
+                "title": title,
+                "content": "",
+                "date": date,
+                "emoji": "📰",
+                "url": url_link
+            })
+    return articles
\ No newline at end of file
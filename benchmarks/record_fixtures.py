@@ -0,0 +1,51 @@
+"""Записывает свежие HTML-снимки kadrovik.uz в benchmarks/fixtures для бенчмарка парсеров.
+
+Запуск: python benchmarks/record_fixtures.py --topic <url темы> --article <url> [--article <url> ...]
+Главная страница и страница поиска записываются всегда.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import aiohttp
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+async def record(session, url, name):
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+        response.raise_for_status()
+        text = await response.text()
+    (FIXTURES / name).write_text(text, encoding="utf-8")
+    print(f"{name}: {len(text.encode('utf-8'))} байт ← {url}")
+
+async def main(args):
+    FIXTURES.mkdir(exist_ok=True)
+    pages = [
+        (args.base_url, "homepage.html"),
+        (f"{args.base_url}search?q={args.query}", "search.html"),
+    ]
+    if args.topic:
+        pages.append((args.topic, "topic.html"))
+    # Статьи по возрастанию размера: small, medium, large, затем article_4...
+    names = ["article_small.html", "article_medium.html", "article_large.html"]
+    for i, url in enumerate(args.article):
+        pages.append((url, names[i] if i < len(names) else f"article_{i + 1}.html"))
+
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
+        for url, name in pages:
+            try:
+                await record(session, url, name)
+            except Exception as e:
+                print(f"{name}: ошибка загрузки {url}: {e}", file=sys.stderr)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--base-url", default="https://kadrovik.uz/")
+    arg_parser.add_argument("--query", default="отпуск")
+    arg_parser.add_argument("--topic", help="URL страницы темы")
+    arg_parser.add_argument("--article", action="append", default=[], help="URL статьи (можно несколько, от короткой к длинной)")
+    asyncio.run(main(arg_parser.parse_args()))
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""Локальная подмена kadrovik.uz для нагрузочных тестов бота без обращения к живому сайту.
+
+Отдаёт записанные снимки из benchmarks/fixtures: главную (/ и /uz/), поиск (/search?q=),
+страницы тем (/group/...) и статьи (/publish/...). Поиск и темы листаются (?page=N, всего --list-pages
+страниц со своими статьями). Можно добавить задержку, долю ошибок 5xx
+и «медленное тело», которое отдаётся кусками с паузами (для проверки таймаутов и отката на кэш).
+
+    python benchmarks/stand_in_server.py --port 8081 --latency 200 --jitter 100 --error-rate 0.05 --slow-rate 0.1
+    KADROVIK_BASE_URL=http://127.0.0.1:8081/ python main.py
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import re
+from pathlib import Path
+from urllib.parse import urlencode
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+ARTICLE_FIXTURES = ["article_small.html", "article_medium.html", "article_large.html"]
+LIST_FIXTURES = {"search.html", "topic.html"}
+
+def load_pages(fixtures_dir, base_url):
+    pages = {}
+    for path in Path(fixtures_dir).glob("*.html"):
+        # Абсолютные ссылки живого сайта в записанных снимках ведут на подмену
+        pages[path.name] = path.read_text(encoding="utf-8").replace("https://kadrovik.uz/", base_url)
+    return pages
+
+def pick_page(request, pages):
+    path = request.path
+    if path in ("/", "/uz/", "/uz"):
+        return "homepage.html"
+    if path.rstrip("/").endswith("/search"):
+        return "search.html"
+    if path.startswith("/group/") or path.startswith("/uz/group/"):
+        return "topic.html"
+    if "/publish/" in path or "/article/" in path or "/news/" in path:
+        # Одна и та же статья всегда отдаёт один и тот же снимок
+        articles = [name for name in ARTICLE_FIXTURES if name in pages]
+        index = int(hashlib.md5(path.encode("utf-8")).hexdigest(), 16) % len(articles)
+        return articles[index]
+    return None
+
+def render_list_page(text, request, page, total):
+    """Страница page списка: у каждой страницы свои статьи, внизу — ссылка на следующую, если она есть"""
+    if page > 1:
+        text = text.replace("/publish/doc/", f"/publish/doc/p{page}-")
+    text = re.sub(r'<div class="pagination">.*?</div>', "", text, flags=re.S)
+    if page < total:
+        query = dict(request.query, page=str(page + 1))
+        text = text.replace("</main>", f'<div class="pagination"><a href="{request.path}?{urlencode(query)}">{page + 1}</a></div></main>', 1)
+    return text
+
+def create_app(args):
+    pages = load_pages(args.fixtures, f"http://{args.host}:{args.port}/")
+    etags = {name: '"%s"' % hashlib.md5(text.encode("utf-8")).hexdigest() for name, text in pages.items()}
+    stats = {"requests": 0, "errors": 0, "slow": 0, "not_modified": 0, "list_pages": 0}
+
+    async def handle(request):
+        stats["requests"] += 1
+        if args.latency or args.jitter:
+            await asyncio.sleep(max(0, args.latency + random.uniform(-args.jitter, args.jitter)) / 1000)
+        if random.random() < args.error_rate:
+            stats["errors"] += 1
+            return web.Response(status=random.choice([500, 502, 503]), text="stand-in error")
+
+        name = pick_page(request, pages)
+        if name is None or name not in pages:
+            return web.Response(status=404, text="not found")
+        text, etag = pages[name], etags[name]
+        if name in LIST_FIXTURES:
+            page = int(request.query.get("page") or 1)
+            if page > args.list_pages:
+                return web.Response(status=404, text="not found")
+            text = render_list_page(text, request, page, args.list_pages)
+            stats["list_pages"] += 1
+            etag = '"%s"' % hashlib.md5(text.encode("utf-8")).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        body = text.encode("utf-8")
+        headers = {"ETag": etag, "Content-Type": "text/html; charset=utf-8"}
+        if random.random() >= args.slow_rate:
+            return web.Response(body=body, headers=headers)
+
+        # Медленное тело: заголовки сразу, содержимое кусками с паузами
+        stats["slow"] += 1
+        response = web.StreamResponse(headers=headers)
+        response.content_length = len(body)
+        await response.prepare(request)
+        for start in range(0, len(body), args.slow_chunk):
+            await response.write(body[start:start + args.slow_chunk])
+            await asyncio.sleep(args.slow_delay / 1000)
+        await response.write_eof()
+        return response
+
+    async def handle_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_get("/_stats", handle_stats)
+    app.router.add_get("/{tail:.*}", handle)
+    return app
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Локальная подмена kadrovik.uz")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8081)
+    arg_parser.add_argument("--fixtures", default=str(FIXTURES))
+    arg_parser.add_argument("--list-pages", type=int, default=3, help="страниц в поиске и темах")
+    arg_parser.add_argument("--latency", type=float, default=0, help="задержка ответа, мс")
+    arg_parser.add_argument("--jitter", type=float, default=0, help="разброс задержки ±, мс")
+    arg_parser.add_argument("--error-rate", type=float, default=0, help="доля ответов 5xx (0..1)")
+    arg_parser.add_argument("--slow-rate", type=float, default=0, help="доля ответов с медленным телом (0..1)")
+    arg_parser.add_argument("--slow-chunk", type=int, default=4096, help="размер куска медленного тела, байт")
+    arg_parser.add_argument("--slow-delay", type=float, default=500, help="пауза между кусками, мс")
+    args = arg_parser.parse_args()
+    print(f"Подмена kadrovik.uz: http://{args.host}:{args.port}/ (статистика: /_stats)")
+    web.run_app(create_app(args), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,34 +1,145 @@
-from dotenv import load_dotenv
-import os
-from aiogram import Bot
-from kadrovik_parser import KadrovikNewsParser
-
-load_dotenv()
-BOT_TOKEN = os.getenv("BOT_TOKEN")
-
-# Проверка токена
-if not BOT_TOKEN:
-    raise ValueError("BOT_TOKEN not found in .env file")
-
-# Инициализация бота
-bot = Bot(token=BOT_TOKEN)
-
-# Константы
-MAX_ARTICLES = 10
-MAX_MESSAGE_LENGTH = 4000
-
-# Временная заглушка для рубрик
-RUBRIKI = {
-    "Трудовое право": "trudovoe-pravo",
-    "Налоги и взносы": "nalogi-vznosy",
-    "Кадровое делопроизводство": "kadrovoe-deloproizvodstvo",
-    "Отпуска": "otpuska",
-    "Больничные": "bolnichnye",
-    "Зарплата": "zarplata",
-    "Охрана труда": "ohrana-truda",
-    "Практические вопросы": "prakticheskie-voprosy"
-}
-
-# Глобальные переменные
-user_data = {}
-news_parser = KadrovikNewsParser()
\ No newline at end of file
+from dotenv import load_dotenv
+import os
+
+# Только настройки: объекты приложения (бот, сессии, парсер) создаёт context.app при старте
+load_dotenv()
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+
+# Режим получения обновлений: "polling" или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # публичный адрес, например https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", "8080"))
+
+# Константы
+MAX_ARTICLES = 10
+MAX_MESSAGE_LENGTH = 4000
+
+# Адрес сайта (можно направить на локальную подмену: benchmarks/stand_in_server.py)
+KADROVIK_BASE_URL = os.getenv("KADROVIK_BASE_URL", "https://kadrovik.uz/").rstrip("/") + "/"
+
+# Пул HTTP-соединений к kadrovik.uz
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 20
+HTTP_DNS_CACHE_TTL = 300
+HTTP_KEEPALIVE_TIMEOUT = 60
+HTTP_RETRIES = 2  # повторов при обрыве соединения и 5xx (таймаут не повторяется)
+HTTP_BACKOFF_BASE = 0.2  # секунд; пауза перед n-м повтором — случайная в [0, base * 2^n]
+HTTP_BACKOFF_MAX = 2.0
+
+# Выключатель на каждый класс адресов kadrovik.uz (главная, поиск, тема, статья):
+# после серии ошибок запросы не отправляются, пользователям сразу отдаётся устаревший кэш
+BREAKER_FAILURE_THRESHOLD = 3  # неудачных запросов подряд до размыкания (запрос с повторами — один)
+BREAKER_COOLDOWN = 30  # секунд до пробного запроса
+BREAKER_MAX_COOLDOWN = 300  # пауза удваивается после каждой неудачной пробы
+
+# Постоянный кэш (SQLite)
+CACHE_DB_PATH = "cache.db"
+CACHE_RETENTION_DAYS = 7
+CACHE_PRUNE_INTERVAL = 6 * 3600  # секунд между очистками по сроку хранения у работающего бота
+
+# Кэш в памяти перед SQLite
+CACHE_MEMORY_MAX_ENTRIES = 500
+CACHE_MEMORY_TTL = 300  # секунд
+CACHE_FLUSH_INTERVAL = 5  # секунд между сбросами на диск
+CACHE_FLUSH_BATCH = 50  # сбросить сразу, если накопилось столько записей
+
+# Кэш текстов статей
+ARTICLE_CACHE_MAX_ITEMS = 2000
+ARTICLE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+ARTICLE_CACHE_FRESH = 3600  # секунд без перепроверки на сайте
+# Потоковый разбор статьи: текст собирается по мере загрузки, после блока статьи чтение прекращается
+ARTICLE_STREAMING = os.getenv("ARTICLE_STREAMING", "1") == "1"
+ARTICLE_MAX_BYTES = 2 * 1024 * 1024  # больше страницы статьи не скачивается
+ARTICLE_STREAM_CHUNK = 16 * 1024
+ARTICLE_STREAM_DRAIN = 64 * 1024  # хвост короче дочитывается: соединение остаётся в пуле вместо закрытия
+
+# Разбор HTML вне цикла событий
+PARSER_FEATURES = "lxml"
+PARSER_EXECUTOR = os.getenv("PARSER_EXECUTOR", "thread")  # "thread" или "process"
+PARSER_WORKERS = 4
+
+# Постраничные списки поиска, тем и рубрик: следующие страницы сайта загружаются только по кнопке «Далее»
+LIST_PAGE_SIZE = MAX_ARTICLES  # статей на одном экране
+LIST_PAGE_CACHE_FRESH = 30 * 60  # секунд, пока страница списка сайта берётся из кэша
+
+# Локальный полнотекстовый поиск
+SEARCH_INDEX_PATH = "search_index.db"
+SEARCH_INDEX_MIN_HITS = 3  # меньше совпадений — дополняем поиском на сайте
+
+# Метрики в формате Prometheus
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Исходящие сообщения: лимиты Telegram Bot API
+OUTBOUND_GLOBAL_RATE = 30  # сообщений в секунду на весь бот
+OUTBOUND_CHAT_RATE = 1  # сообщений в секунду в личный чат
+OUTBOUND_CHAT_BURST = 3  # сколько сообщений подряд можно отправить в чат без ожидания
+OUTBOUND_GROUP_RATE = 20 / 60  # сообщений в секунду в группу
+OUTBOUND_MAX_RETRIES = 3  # повторов после 429 Too Many Requests
+OUTBOUND_MAX_CHATS = 10000  # сколько счётчиков чатов держать в памяти
+
+# Логирование: JSON-строки через очередь и отдельный поток вывода
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" или "text"
+LOG_DEBUG_SAMPLE_EVERY = int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "10"))  # из DEBUG-записей одного места пишется каждая N-я
+
+# Фоновое обновление кэша
+CRAWLER_ENABLED = os.getenv("CRAWLER_ENABLED", "1") == "1"
+CRAWLER_INTERVAL = 30 * 60  # секунд между проходами
+CRAWLER_JITTER = 120  # случайный сдвиг интервала, секунд
+CRAWLER_TOP_ARTICLES = 15  # сколько текстов статей держать в кэше
+CRAWLER_REQUEST_DELAY = 1  # пауза между запросами к сайту, секунд
+
+# Временная заглушка для рубрик
+RUBRIKI = {
+    "Трудовое право": "trudovoe-pravo",
+    "Налоги и взносы": "nalogi-vznosy",
+    "Кадровое делопроизводство": "kadrovoe-deloproizvodstvo",
+    "Отпуска": "otpuska",
+    "Больничные": "bolnichnye",
+    "Зарплата": "zarplata",
+    "Охрана труда": "ohrana-truda",
+    "Практические вопросы": "prakticheskie-voprosy"
+}
+
+# Реестр статей и тем: стабильные идентификаторы для кнопок, общий для всех процессов бота
+REGISTRY_DB_PATH = os.getenv("REGISTRY_DB_PATH", "registry.db")
+REGISTRY_MEMORY_ITEMS = 5000
+
+# Подписки на новые статьи
+SUBSCRIPTIONS_DB_PATH = "subscriptions.db"
+SUBSCRIPTIONS_BATCH = 100  # получателей в пачке рассылки
+SUBSCRIPTIONS_MAX_ATTEMPTS = 3  # попыток доставки одному подписчику
+SUBSCRIPTIONS_MAX_ARTICLES = 5  # статей в одном уведомлении
+SUBSCRIPTIONS_RETRY_BASE = 60  # секунд до повтора недоставленного уведомления, удваивается с каждой попыткой
+SUBSCRIPTIONS_RETRY_MAX = 15 * 60
+
+# Пользователи
+USERS_DB_PATH = "users.db"
+USERS_FLUSH_INTERVAL = 0.5  # секунд на сбор пачки регистраций перед записью
+
+# Сессии пользователей
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # "memory" или "sqlite"
+SESSION_DB_PATH = "sessions.db"
+SESSION_IDLE_TTL = 6 * 3600  # секунд простоя до вытеснения
+SESSION_MAX_USERS = 10000
+SESSION_MAX_BYTES = 64 * 1024 * 1024
+SESSION_CLEANUP_INTERVAL = 300
+
+# Тёплый старт: при остановке горячие данные из памяти сохраняются и восстанавливаются при запуске
+WARM_START_PATH = "warm_start.json"
+WARM_START_MAX_AGE = 3600  # снимок старше этого (секунд) не восстанавливается
+
+# Кэш готовых экранов (текст и клавиатура) по версии данных
+RENDER_CACHE_MAX_ENTRIES = 256
+
+# Упреждающая загрузка текстов первых статей показанного списка
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_TOP_N = 3  # статей с начала списка
+PREFETCH_CONCURRENCY = 4  # одновременных загрузок на весь бот
+PREFETCH_RATE = 2  # загрузок в секунду на весь бот (бюджет), сверх него упреждение пропускается
+PREFETCH_BURST = 10
\ No newline at end of file
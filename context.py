@@ -0,0 +1,50 @@
+from aiogram import Bot
+from kadrovik_parser import KadrovikNewsParser
+from config import (
+    BOT_TOKEN, BOT_MODE, WEBHOOK_SECRET, KADROVIK_BASE_URL,
+    SESSION_BACKEND, SESSION_DB_PATH, SESSION_IDLE_TTL, SESSION_MAX_USERS, SESSION_MAX_BYTES
+)
+
+class AppContext:
+    """Объекты приложения: создаются при первом обращении, а не при импорте config.
+    Импорт модулей бота не открывает сессий и файлов — это делает main при старте."""
+
+    def __init__(self):
+        self._bot = None
+        self._user_sessions = None
+        self._news_parser = None
+
+    def check_settings(self):
+        """Проверка обязательных настроек; вызывается при старте бота"""
+        if not BOT_TOKEN:
+            raise ValueError("BOT_TOKEN not found in .env file")
+        if BOT_MODE == "webhook" and not WEBHOOK_SECRET:
+            raise ValueError("WEBHOOK_SECRET not found in .env file")
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            if not BOT_TOKEN:
+                raise ValueError("BOT_TOKEN not found in .env file")
+            self._bot = Bot(token=BOT_TOKEN)
+        return self._bot
+
+    @property
+    def user_sessions(self):
+        if self._user_sessions is None:
+            from utils.sessions import SessionStore, create_session_backend
+            self._user_sessions = SessionStore(
+                create_session_backend(SESSION_BACKEND, SESSION_DB_PATH),
+                idle_ttl=SESSION_IDLE_TTL,
+                max_users=SESSION_MAX_USERS,
+                max_bytes=SESSION_MAX_BYTES
+            )
+        return self._user_sessions
+
+    @property
+    def news_parser(self):
+        if self._news_parser is None:
+            self._news_parser = KadrovikNewsParser(KADROVIK_BASE_URL)
+        return self._news_parser
+
+app = AppContext()
\ No newline at end of file
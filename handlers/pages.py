@@ -0,0 +1,73 @@
+from aiogram import Dispatcher, types
+from keyboards import get_back_to_main_menu
+from utils.registry import register_items, get_item, callback_item_id
+from utils.pagination import load_page, cursor_id, prefetch_target
+from utils.prefetch import prefetcher
+import html
+import logging
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+logger = logging.getLogger(__name__)
+
+# Экран списка: (префикс кнопок статей, заголовок, кнопка возврата)
+LIST_SCREENS = {
+    "search": ("search_article", "🔍 <b>Результаты поиска</b> по запросу '{title}'", ("🔍 Новый поиск", "kadrovik_search")),
+    "rubrika": ("rubrika_article", "📂 <b>{title}</b>", ("◶️ К рубрикам", "kadrovik_news")),
+    "topic": ("topic_article", "📚 <b>{title}</b>", ("◶️ К темам", "kadrovik_latest"))
+}
+
+async def add_next_page_button(builder, next_cursor):
+    """Кнопка «Далее» на следующий экран списка; на последнем экране её нет"""
+    if next_cursor:
+        next_id = await cursor_id(next_cursor)
+        builder.add(types.InlineKeyboardButton(
+            text=f"➡️ Далее (стр. {next_cursor['number']})",
+            callback_data=f"page_{next_id}"
+        ))
+
+async def handle_list_page(callback: types.CallbackQuery):
+    """Следующий экран поиска, рубрики или темы: страница сайта загружается только сейчас (или уже упреждением)"""
+    await callback.answer()
+    try:
+        cursor = await get_item(callback_item_id(callback.data))
+        if not cursor or cursor.get("screen") not in LIST_SCREENS:
+            await callback.message.answer("❌ Список устарел, откройте его заново", reply_markup=get_back_to_main_menu())
+            return
+        prefix, heading, (back_text, back_data) = LIST_SCREENS[cursor["screen"]]
+        await callback.message.edit_text(f"🔄 Загружаю страницу {cursor['number']}...")
+
+        articles, next_cursor = await load_page(cursor)
+        builder = InlineKeyboardBuilder()
+        if not articles:
+            builder.add(types.InlineKeyboardButton(text=back_text, callback_data=back_data))
+            await callback.message.edit_text("📭 Больше статей нет.", reply_markup=builder.as_markup())
+            return
+
+        article_ids = await register_items("article", articles)
+        for article_id, article in zip(article_ids, articles):
+            title_short = article["title"][:45] + "..." if len(article["title"]) > 45 else article["title"]
+            builder.add(types.InlineKeyboardButton(
+                text=f"📄 {title_short}",
+                callback_data=f"{prefix}_{article_id}"
+            ))
+        await add_next_page_button(builder, next_cursor)
+        builder.row(
+            types.InlineKeyboardButton(text=back_text, callback_data=back_data),
+            types.InlineKeyboardButton(text="🏠 Главная", callback_data="main_menu")
+        )
+        builder.adjust(1)
+
+        message_text = heading.format(title=html.escape(cursor["title"])) + f"\n📄 Страница {cursor['number']}\n\n"
+        for i, article in enumerate(articles):
+            message_text += f"{i + 1}. {html.escape(article['title'])}\n"
+        message_text += "\n👆 <b>Выберите статью для чтения:</b>"
+
+        await callback.message.edit_text(message_text, reply_markup=builder.as_markup(), parse_mode='HTML')
+        # Пока читается эта страница, следующая загружается заранее
+        prefetcher.schedule(callback.from_user.id, articles, prefetch_target(next_cursor))
+    except Exception as e:
+        logger.error(f"Ошибка загрузки страницы списка: {e}")
+        await callback.message.answer("❌ Не удалось загрузить страницу. Попробуйте позже.", reply_markup=get_back_to_main_menu())
+
+def register_pages_handlers(dp: Dispatcher):
+    dp.callback_query.register(handle_list_page, lambda c: c.data.startswith("page_"))
\ No newline at end of file
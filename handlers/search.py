@@ -1,84 +1,116 @@
-from aiogram import Dispatcher, types
-from aiogram.fsm.context import FSMContext
-from keyboards import get_back_to_main_menu
-from utils.helpers import send_article_content, format_search_results_text
-from config import user_data, MAX_ARTICLES  # Убедимся, что MAX_ARTICLES импортируется
-from parser import search_articles
-from states import SearchStates
-import logging
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-
-logger = logging.getLogger(__name__)
-
-async def handle_search(callback: types.CallbackQuery, state: FSMContext):
-    await callback.answer()
-    await callback.message.edit_text(
-        "🔍 **Поиск по статьям**\n\n"
-        "Введите ключевые слова для поиска:\n"
-        "Например: 'трудовой договор', 'отпуск', 'налоги' и т.д.",
-        reply_markup=get_back_to_main_menu()
-    )
-    await state.set_state(SearchStates.WAITING_FOR_QUERY)
-
-async def process_search_query(message: types.Message, state: FSMContext):
-    query = message.text.strip()
-    if len(query) < 2:
-        await message.answer("❌ Запрос должен содержать минимум 2 символа. Попробуйте снова:")
-        return
-    
-    try:
-        await message.answer("🔍 Ищу статьи по вашему запросу...")
-        articles = await search_articles(query, "ru")
-        
-        if not articles:
-            await message.answer(
-                f"❌ По запросу '{query}' ничего не найдено.\n"
-                "Попробуйте изменить ключевые слова.",
-                reply_markup=get_back_to_main_menu()
-            )
-            await state.clear()
-            return
-        
-        user_data[message.from_user.id] = {"search_results": articles, "search_query": query}
-        
-        builder = InlineKeyboardBuilder()
-        for i in range(min(len(articles), MAX_ARTICLES)):
-            title_short = articles[i]["title"][:40] + "..." if len(articles[i]["title"]) > 40 else articles[i]["title"]
-            builder.add(types.InlineKeyboardButton(
-                text=f"📄 {title_short}",
-                callback_data=f"search_article_{i}"
-            ))
-        builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
-        builder.adjust(1)
-        
-        results_text = format_search_results_text(articles, query)
-        
-        await message.answer(results_text, reply_markup=builder.as_markup(), parse_mode='Markdown')
-        await state.clear()
-        
-    except Exception as e:
-        logger.error(f"Ошибка поиска: {e}")
-        await message.answer(
-            "❌ Произошла ошибка при поиске. Попробуйте позже.",
-            reply_markup=get_back_to_main_menu()
-        )
-        await state.clear()
-
-async def handle_search_article(callback: types.CallbackQuery):
-    await callback.answer()
-    try:
-        idx = int(callback.data.split("_")[2])
-        user_search_results = user_data.get(callback.from_user.id, {}).get("search_results", [])
-        
-        if 0 <= idx < len(user_search_results):
-            await send_article_content(callback.from_user.id, user_search_results[idx])
-        else:
-            await callback.message.answer("❌ Статья не найдена", reply_markup=get_back_to_main_menu())
-    except (IndexError, ValueError) as e:
-        logger.error(f"Ошибка обработки результата поиска: {e}")
-        await callback.message.answer("❌ Ошибка: неверный идентификатор статьи", reply_markup=get_back_to_main_menu())
-
-def register_search_handlers(dp: Dispatcher):
-    dp.callback_query.register(handle_search, lambda c: c.data == "kadrovik_search")
-    dp.message.register(process_search_query, SearchStates.WAITING_FOR_QUERY)
+from aiogram import Dispatcher, types
+from aiogram.fsm.context import FSMContext
+from keyboards import get_back_to_main_menu
+from utils.helpers import send_article_content, format_search_results_text
+from config import MAX_ARTICLES  # Убедимся, что MAX_ARTICLES импортируется
+from context import app
+from parser import search_articles
+from utils.registry import register_items, get_item, callback_item_id
+from utils.prefetch import prefetcher
+from utils.pagination import search_next_cursor, prefetch_target
+from handlers.pages import add_next_page_button
+from states import SearchStates
+import logging
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+logger = logging.getLogger(__name__)
+
+async def handle_search(callback: types.CallbackQuery, state: FSMContext):
+    await callback.answer()
+    # Прошлый запрос из сессии — его можно повторить одной кнопкой
+    last_query = await app.user_sessions.get(callback.from_user.id, "search_query")
+    reply_markup = get_back_to_main_menu()
+    if last_query:
+        builder = InlineKeyboardBuilder()
+        builder.add(types.InlineKeyboardButton(
+            text=f"🔁 Повторить: {last_query[:30]}",
+            callback_data="search_repeat"
+        ))
+        builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
+        builder.adjust(1)
+        reply_markup = builder.as_markup()
+    await callback.message.edit_text(
+        "🔍 **Поиск по статьям**\n\n"
+        "Введите ключевые слова для поиска:\n"
+        "Например: 'трудовой договор', 'отпуск', 'налоги' и т.д.",
+        reply_markup=reply_markup
+    )
+    await state.set_state(SearchStates.WAITING_FOR_QUERY)
+
+async def process_search_query(message: types.Message, state: FSMContext):
+    query = message.text.strip()
+    if len(query) < 2:
+        await message.answer("❌ Запрос должен содержать минимум 2 символа. Попробуйте снова:")
+        return
+    await run_search(message, message.from_user.id, query)
+    await state.clear()
+
+async def handle_search_repeat(callback: types.CallbackQuery, state: FSMContext):
+    await callback.answer()
+    await state.clear()
+    query = await app.user_sessions.get(callback.from_user.id, "search_query")
+    if not query:
+        await callback.message.answer("❌ Прошлый запрос не найден, введите новый", reply_markup=get_back_to_main_menu())
+        return
+    await run_search(callback.message, callback.from_user.id, query)
+
+async def run_search(message: types.Message, user_id: int, query: str):
+    """Поиск и экран результатов; удачный запрос запоминается в сессии для повтора"""
+    try:
+        await message.answer("🔍 Ищу статьи по вашему запросу...")
+        articles = await search_articles(query, "ru")
+        
+        if not articles:
+            await message.answer(
+                f"❌ По запросу '{query}' ничего не найдено.\n"
+                "Попробуйте изменить ключевые слова.",
+                reply_markup=get_back_to_main_menu()
+            )
+            return
+        
+        await app.user_sessions.set(user_id, "search_query", query)
+        article_ids = await register_items("article", articles[:MAX_ARTICLES])
+        
+        builder = InlineKeyboardBuilder()
+        for article_id, article in zip(article_ids, articles):
+            title_short = article["title"][:40] + "..." if len(article["title"]) > 40 else article["title"]
+            builder.add(types.InlineKeyboardButton(
+                text=f"📄 {title_short}",
+                callback_data=f"search_article_{article_id}"
+            ))
+        # Дальше — страницы поиска на сайте, загружаются по кнопке
+        next_cursor = await search_next_cursor("search", query, query, "ru", articles[:MAX_ARTICLES])
+        await add_next_page_button(builder, next_cursor)
+        builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
+        builder.adjust(1)
+        
+        results_text = format_search_results_text(articles, query)
+        
+        await message.answer(results_text, reply_markup=builder.as_markup(), parse_mode='Markdown')
+        prefetcher.schedule(user_id, articles, prefetch_target(next_cursor))
+        
+    except Exception as e:
+        logger.error(f"Ошибка поиска: {e}")
+        await message.answer(
+            "❌ Произошла ошибка при поиске. Попробуйте позже.",
+            reply_markup=get_back_to_main_menu()
+        )
+
+async def handle_search_article(callback: types.CallbackQuery):
+    await callback.answer()
+    try:
+        article = await get_item(callback_item_id(callback.data))
+        
+        if article:
+            await send_article_content(callback.from_user.id, article)
+        else:
+            await callback.message.answer("❌ Статья не найдена", reply_markup=get_back_to_main_menu())
+    except IndexError as e:
+        logger.error(f"Ошибка обработки результата поиска: {e}")
+        await callback.message.answer("❌ Ошибка: неверный идентификатор статьи", reply_markup=get_back_to_main_menu())
+
+def register_search_handlers(dp: Dispatcher):
+    dp.callback_query.register(handle_search, lambda c: c.data == "kadrovik_search")
+    dp.message.register(process_search_query, SearchStates.WAITING_FOR_QUERY)
+    dp.callback_query.register(handle_search_repeat, lambda c: c.data == "search_repeat")
     dp.callback_query.register(handle_search_article, lambda c: c.data.startswith("search_article_"))
\ No newline at end of file
@@ -0,0 +1,93 @@
+import html
+from aiogram import Dispatcher, types
+from config import RUBRIKI
+from keyboards import get_back_to_main_menu
+from utils.subscriptions import subscribe, unsubscribe, get_user_subscriptions
+from utils.registry import register_items, get_item, callback_item_id
+import logging
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+logger = logging.getLogger(__name__)
+
+async def show_subscriptions(callback: types.CallbackQuery):
+    subscriptions = await get_user_subscriptions(callback.from_user.id)
+    subscribed_rubriki = {item["key"] for item in subscriptions if item["kind"] == "rubrika"}
+    topics = [{"title": item["title"], "url": item["key"]} for item in subscriptions if item["kind"] == "topic"]
+    topic_ids = await register_items("topic", topics)
+
+    builder = InlineKeyboardBuilder()
+    for rubrika_name, slug in RUBRIKI.items():
+        mark = "✅" if slug in subscribed_rubriki else "➕"
+        builder.add(types.InlineKeyboardButton(text=f"{mark} {rubrika_name}", callback_data=f"sub_r_{slug}"))
+    for topic_id, topic in zip(topic_ids, topics):
+        title_short = topic["title"][:40] + "..." if len(topic["title"]) > 40 else topic["title"]
+        builder.add(types.InlineKeyboardButton(text=f"❌ {title_short}", callback_data=f"unsub_t_{topic_id}"))
+    builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
+    builder.adjust(*([2] * ((len(RUBRIKI) + 1) // 2)), 1)
+
+    text = "🔔 <b>Подписки на новые статьи</b>\n\n"
+    text += "Нажмите на рубрику, чтобы подписаться или отписаться (✅ — вы подписаны).\n"
+    if topics:
+        text += "\n📚 <b>Темы:</b>\n" + "\n".join(f"• {html.escape(topic['title'])}" for topic in topics) + "\n\nНажмите ❌, чтобы отписаться от темы.\n"
+    else:
+        text += "На тему можно подписаться со страницы темы в разделе «Все темы 34».\n"
+
+    await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode='HTML')
+
+async def handle_subscriptions(callback: types.CallbackQuery):
+    """Обработчик кнопки Подписки"""
+    await callback.answer()
+    try:
+        await show_subscriptions(callback)
+    except Exception as e:
+        logger.error(f"Ошибка загрузки подписок: {e}")
+        await callback.message.edit_text("❌ Не удалось загрузить подписки. Попробуйте позже.", reply_markup=get_back_to_main_menu())
+
+async def handle_toggle_rubrika(callback: types.CallbackQuery):
+    """Подписка на рубрику или отписка от неё"""
+    slug = callback.data.split("_", 2)[2]
+    rubrika_name = next((name for name, value in RUBRIKI.items() if value == slug), None)
+    if not rubrika_name:
+        await callback.answer("❌ Рубрика не найдена")
+        return
+    subscriptions = await get_user_subscriptions(callback.from_user.id)
+    if any(item["kind"] == "rubrika" and item["key"] == slug for item in subscriptions):
+        await unsubscribe(callback.from_user.id, "rubrika", slug)
+        await callback.answer(f"Вы отписались от рубрики «{rubrika_name}»")
+    else:
+        await subscribe(callback.from_user.id, "rubrika", slug, rubrika_name)
+        await callback.answer(f"🔔 Вы подписались на рубрику «{rubrika_name}»")
+    await show_subscriptions(callback)
+
+async def handle_subscribe_topic(callback: types.CallbackQuery):
+    """Подписка на тему со страницы темы"""
+    try:
+        topic = await get_item(callback_item_id(callback.data))
+        if not topic:
+            await callback.answer("❌ Тема не найдена")
+            return
+        await subscribe(callback.from_user.id, "topic", topic["url"], topic["title"])
+        await callback.answer(f"🔔 Вы подписались на тему «{topic['title'][:100]}»", show_alert=True)
+    except IndexError as e:
+        logger.error(f"Ошибка подписки на тему: {e}")
+        await callback.answer("❌ Ошибка: неверный идентификатор темы")
+
+async def handle_unsubscribe_topic(callback: types.CallbackQuery):
+    """Отписка от темы из списка подписок"""
+    try:
+        topic = await get_item(callback_item_id(callback.data))
+        if not topic:
+            await callback.answer("❌ Подписка не найдена")
+            return
+        await unsubscribe(callback.from_user.id, "topic", topic["url"])
+        await callback.answer("Вы отписались от темы")
+        await show_subscriptions(callback)
+    except IndexError as e:
+        logger.error(f"Ошибка отписки от темы: {e}")
+        await callback.answer("❌ Ошибка: неверный идентификатор подписки")
+
+def register_subscriptions_handlers(dp: Dispatcher):
+    dp.callback_query.register(handle_subscriptions, lambda c: c.data == "subscriptions")
+    dp.callback_query.register(handle_toggle_rubrika, lambda c: c.data.startswith("sub_r_"))
+    dp.callback_query.register(handle_subscribe_topic, lambda c: c.data.startswith("sub_t_"))
+    dp.callback_query.register(handle_unsubscribe_topic, lambda c: c.data.startswith("unsub_t_"))
\ No newline at end of file
@@ -1,62 +1,661 @@
-import asyncio
-import logging
-from datetime import datetime
-import aiohttp
-from bs4 import BeautifulSoup
-import re
-
-class KadrovikNewsParser:
-    def __init__(self):
-        self.base_url = "https://kadrovik.uz"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        }
-        self.news_cache = []
-
-    async def get_page_content(self, url):
-        """Получает содержимое страницы"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers, timeout=15) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        logging.error(f"Ошибка получения страницы {url}: {response.status}")
-                        return None
-        except asyncio.TimeoutError:
-            logging.error(f"Таймаут при запросе к {url}")
-            return None
-        except Exception as e:
-            logging.error(f"Ошибка при запросе к {url}: {e}")
-            return None
-
-    def clean_text(self, text):
-        """Очищает текст от лишних символов"""
-        if not text:
-            return ""
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[^\w\s\-.,!?():;]', '', text)
-        return text
-
-    def parse_main_page(self, html_content):
-        """Парсит главную страницу и извлекает новости"""
-        # ... (весь код метода parse_main_page) ...
-        return news_items[:10]
-
-    async def get_news(self):
-        """Получает список новостей"""
-        html_content = await self.get_page_content(self.base_url)
-        if html_content:
-            news_list = self.parse_main_page(html_content)
-            self.news_cache = news_list
-            return news_list
-        return []
-
-    async def get_article_content(self, url):
-        """Получает полный текст статьи"""
-        # ... (весь код метода get_article_content) ...
-        return content
\ No newline at end of file
+import asyncio
+import logging
+import re
+from datetime import datetime
+from functools import cache
+from urllib.parse import urljoin, urlsplit, parse_qs
+import aiohttp
+from config import PARSER_FEATURES, MAX_ARTICLES
+from utils.breaker import CircuitOpenError
+from utils.http_client import fetch_text
+from utils.parsing import run_parser
+
+logger = logging.getLogger(__name__)
+
+# Декларативное описание страниц kadrovik.uz для движка извлечения:
+#   strainer — (имя тега, класс): разбираются только такие теги и их содержимое; None — вся страница
+#   item     — CSS-селектор элемента списка; None — вся страница как одна запись
+#   fields   — поле: (CSS-селектор внутри элемента или None для самого элемента, что взять); берётся первое совпадение
+#   rest     — поле для текста элемента без узлов, совпавших с fields
+#   blocks   — (область, блоки): все блоки внутри первой найденной области по порядку;
+#              blocks_fallback — область, если основной нет (страница тогда разбирается целиком)
+# Что взять: "text" — текст без пробелов по краям, "spaced" — текст с пробелами между узлами, "@имя" — атрибут.
+PAGE_SPECS = {
+    "homepage": {
+        "strainer": ("ul", "posts-list"),
+        "item": "ul.posts-list li.post-card-wrapper, ul.posts-list li.post-card--horizontal-wrapper",
+        "fields": {
+            "url": ("a[href]", "@href"),
+            "title": ("h4.post-card__title", "text"),
+            "date": ("time.longread-post__time-published", "text")
+        }
+    },
+    "search": {
+        "strainer": ("ol", "results"),
+        "item": "ol.results li",
+        "fields": {
+            "url": ("a", "@href"),
+            "title": ("a", "text"),
+            "date": ("span.date", "text")
+        },
+        "rest": "content"
+    },
+    "topics": {
+        "strainer": ("ul", "tax-code__list"),
+        "item": "ul.tax-code__list li.tax-code__list-item a.tax-code__list-link",
+        "fields": {
+            "url": (None, "@href"),
+            "title": (None, "text")
+        }
+    },
+    "topic": {
+        "strainer": ("ul", "rec-selected__content-item"),
+        "item": "ul.rec-selected__content-item li a.rec-block__info-post",
+        "fields": {
+            "url": (None, "@href"),
+            "title": ("h3.info-post__title-item", "text")
+        }
+    },
+    "pagination": {
+        "strainer": (["div", "nav", "ul"], "pagination"),
+        "item": ".pagination a[href]",
+        "fields": {
+            "url": (None, "@href"),
+            "label": (None, "text")
+        }
+    },
+    "article": {
+        "strainer": (["h1", "time", "section"], None),
+        "item": None,
+        "fields": {
+            "title": ("h1", "text"),
+            "date": ("time.longread-post__time-published", "@datetime")
+        },
+        "blocks": ("section.longread-block", "p, strong"),
+        "blocks_fallback": "body"
+    }
+}
+
+# Запасной разбор главной при новой вёрстке: первый селектор, давший ссылки, определяет список
+FALLBACK_LINK_SELECTORS = [
+    "a[href*='/publish/']",
+    "a[href*='/article/']",
+    ".article-link",
+    ".publication-link",
+    "article a",
+    ".content a[href]",
+    "main a[href]"
+]
+
+# Правая часть селектора: тег, классы и атрибуты ([a], [a='v'], [a*='v'])
+_COMPOUND = re.compile(r"""(?P<name>[a-zA-Z][\w-]*)?(?P<rest>(?:\.[\w-]+|\[[\w-]+(?:\*?=(?:'[^']*'|"[^"]*"))?\])*)$""")
+_COMPOUND_PART = re.compile(r"""\.([\w-]+)|\[([\w-]+)(?:(\*?=)(?:'([^']*)'|"([^"]*)"))?\]""")
+
+class CompiledSelector:
+    """CSS-селектор, скомпилированный один раз.
+    Правая часть каждого варианта селектора превращается в проверку тега, классов и атрибутов: она отсеивает
+    почти все узлы без soupsieve, а селектор из одной такой части решает полностью."""
+
+    def __init__(self, css):
+        import soupsieve
+        self.css = css
+        self.pattern = soupsieve.compile(css)
+        self.checks = []  # (тег, классы, атрибуты, проверка исчерпывающая)
+        for part in css.split(","):
+            compounds = part.split()
+            compound = _COMPOUND.match(compounds[-1])
+            if compound is None:
+                self.checks = None
+                break
+            classes, attrs = [], []
+            for item in _COMPOUND_PART.finditer(compound.group("rest")):
+                if item.group(1):
+                    classes.append(item.group(1))
+                else:
+                    value = item.group(4) if item.group(4) is not None else item.group(5)
+                    attrs.append((item.group(2).lower(), item.group(3), value))
+            name = compound.group("name")
+            self.checks.append((name.lower() if name else None, tuple(classes), tuple(attrs), len(compounds) == 1))
+        # Имена тегов, на которых селектор вообще может совпасть (None — любые)
+        self.names = None
+        if self.checks and all(name for name, _, _, _ in self.checks):
+            self.names = {name for name, _, _, _ in self.checks}
+
+    def match(self, tag):
+        if self.checks is None:
+            return bool(self.pattern.match(tag))
+        for name, classes, attrs, exhaustive in self.checks:
+            if _passes(tag, name, classes, attrs):
+                return True if exhaustive else bool(self.pattern.match(tag))
+        return False
+
+def _passes(tag, name, classes, attrs):
+    if name is not None and tag.name != name:
+        return False
+    if classes:
+        tag_classes = tag.get("class") or ()
+        for class_ in classes:
+            if class_ not in tag_classes:
+                return False
+    for attr, operator, value in attrs:
+        actual = tag.get(attr)
+        if actual is None:
+            return False
+        if operator == "=" and actual != value:
+            return False
+        if operator == "*=" and (not value or value not in actual):
+            return False
+    return True
+
+def _value(tag, what):
+    if what == "text":
+        return tag.get_text(strip=True)
+    if what == "spaced":
+        return tag.get_text(" ", strip=True)
+    return tag.get(what[1:], "")
+
+class ExtractionEngine:
+    """Извлечение данных по декларативному описанию страниц.
+    Селекторы компилируются один раз на процесс, дерево страницы обходится за один проход."""
+
+    def __init__(self, specs):
+        self.specs = specs
+        self._compiled = {}
+
+    def _compile(self, page):
+        compiled = self._compiled.get(page)
+        if compiled is None:
+            spec = self.specs[page]
+            scope, block = spec.get("blocks", (None, None))
+            compiled = {
+                "item": CompiledSelector(spec["item"]) if spec.get("item") else None,
+                "fields": [
+                    (name, CompiledSelector(css) if css else None, what)
+                    for name, (css, what) in spec["fields"].items()
+                ],
+                "rest": spec.get("rest"),
+                "scope": CompiledSelector(scope) if scope else None,
+                "block": CompiledSelector(block) if block else None,
+                "fallback_scope": CompiledSelector(spec["blocks_fallback"]) if spec.get("blocks_fallback") else None
+            }
+            # Гонка потоков пула безвредна: оба скомпилируют одно и то же
+            self._compiled[page] = compiled
+        return compiled
+
+    def compile_all(self):
+        for page in self.specs:
+            self._compile(page)
+        self._compiled[tuple(FALLBACK_LINK_SELECTORS)] = [CompiledSelector(css) for css in FALLBACK_LINK_SELECTORS]
+
+    def _parse(self, html, features, strainer=None):
+        from bs4 import BeautifulSoup, SoupStrainer
+        if strainer is None:
+            return BeautifulSoup(html, features)
+        name, class_ = strainer
+        only = SoupStrainer(name, class_=class_) if class_ else SoupStrainer(name)
+        return BeautifulSoup(html, features, parse_only=only)
+
+    def extract(self, page, html, features=PARSER_FEATURES):
+        """Записи страницы — словари с сырыми значениями полей; для страницы без item — одна запись"""
+        compiled = self._compile(page)
+        records = self._walk(self._parse(html, features, self.specs[page].get("strainer")), compiled)
+        fallback = compiled["fallback_scope"]
+        if fallback is not None:
+            for record in records:
+                if "blocks" not in record:
+                    record.update(self._walk(self._parse(html, features), dict(compiled, fields=[], scope=fallback))[0])
+        return records
+
+    def _walk(self, root, compiled):
+        from bs4 import NavigableString, CData, Tag
+        text_types = (NavigableString, CData)
+        item_selector, rest = compiled["item"], compiled["rest"]
+        scope_selector, block_selector = compiled["scope"], compiled["block"]
+        self_fields = [(name, what) for name, selector, what in compiled["fields"] if selector is None]
+        # Поля по имени тега: для узла проверяются только поля, которые могут на нём совпасть
+        fields_by_name = {}
+        any_name_fields = []
+        for name, selector, what in compiled["fields"]:
+            if selector is None:
+                continue
+            if selector.names is None:
+                any_name_fields.append((name, selector, what))
+            else:
+                for tag_name in selector.names:
+                    fields_by_name.setdefault(tag_name, []).append((name, selector, what))
+        records = []
+        page_record = None
+        if item_selector is None:
+            page_record = {}
+            records.append(page_record)
+        # Обход в порядке документа: (узел, запись его элемента, внутри совпавшего поля, внутри области блоков)
+        stack = [(child, page_record, False, False) for child in reversed(root.contents)]
+        while stack:
+            node, record, in_field, in_scope = stack.pop()
+            if not isinstance(node, Tag):
+                if record is not None and not in_field and type(node) in text_types:
+                    text = node.strip()
+                    if text:
+                        record.setdefault(rest, []).append(text)
+                continue
+            if record is None:
+                if item_selector.match(node):
+                    record = {}
+                    records.append(record)
+                    for name, what in self_fields:
+                        record[name] = _value(node, what)
+            else:
+                candidates = fields_by_name.get(node.name)
+                for fields in (candidates, any_name_fields) if candidates else (any_name_fields,):
+                    for name, selector, what in fields:
+                        if name not in record and selector.match(node):
+                            record[name] = _value(node, what)
+                            in_field = True
+                if in_scope:
+                    if block_selector.match(node):
+                        record["blocks"].append((node.name, node.get_text(" ", strip=True)))
+                elif scope_selector is not None and "blocks" not in record and scope_selector.match(node):
+                    record["blocks"] = []
+                    in_scope = True
+            if rest:
+                stack.extend((child, record, in_field, in_scope) for child in reversed(node.contents))
+            else:
+                # Текст нужен только для rest — строки в стек не кладём
+                stack.extend((child, record, in_field, in_scope) for child in reversed(node.contents) if isinstance(child, Tag))
+        if rest:
+            for record in records:
+                record[rest] = " ".join(record.get(rest, ()))
+        return records
+
+    def select_first(self, html, selectors, extra, features=PARSER_FEATURES):
+        """Совпадения первого из selectors, давшего хоть одно, и узлы, прошедшие extra(tag), — за один проход по странице"""
+        from bs4 import Tag
+        soup = self._parse(html, features)
+        compiled = self._compiled.get(tuple(selectors))
+        if compiled is None:
+            compiled = self._compiled[tuple(selectors)] = [CompiledSelector(css) for css in selectors]
+        matches = [[] for _ in compiled]
+        extra_matches = []
+        found_index = len(compiled)  # селекторы после первого уже совпавшего не нужны
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+            for index in range(found_index):
+                if compiled[index].match(node):
+                    matches[index].append(node)
+                    found_index = index + 1
+                    break
+            if extra(node):
+                extra_matches.append(node)
+        first = next((found for found in matches if found), [])
+        return soup, first, extra_matches
+
+engine = ExtractionEngine(PAGE_SPECS)
+
+@cache
+def _stream_checks(css):
+    """Проверки селектора для потокового разбора: без дерева годятся только селекторы из одной части"""
+    checks = CompiledSelector(css).checks
+    if not checks or not all(exhaustive for _, _, _, exhaustive in checks):
+        raise ValueError(f"Селектор {css!r} нельзя проверить без дерева страницы")
+    return checks
+
+def _start_matches(checks, tag, attrib):
+    classes = attrib.get("class", "").split()
+    for name, required_classes, attrs, _ in checks:
+        if name is not None and tag != name:
+            continue
+        if any(class_ not in classes for class_ in required_classes):
+            continue
+        if all(
+            attrib.get(attr) is not None
+            and (operator != "=" or attrib[attr] == value)
+            and (operator != "*=" or (value and value in attrib[attr]))
+            for attr, operator, value in attrs
+        ):
+            return True
+    return False
+
+class StreamingArticleExtractor:
+    """Потоковый разбор статьи по PAGE_SPECS["article"] (lxml, интерфейс feed/target): дерево не строится.
+    Блоки текста готовы по мере чтения; когда область блоков закрыта и все поля найдены, feed возвращает True —
+    дальше читать не нужно. Поле, стоящее после области (заголовок ниже текста), дочитывается до конца страницы.
+    Результат совпадает с extract_article_content."""
+
+    # Текст этих тегов BeautifulSoup не включает в get_text
+    SKIP_TEXT = {"script", "style", "template"}
+
+    def __init__(self, spec=PAGE_SPECS["article"]):
+        self.fields = [(name, _stream_checks(css), what) for name, (css, what) in spec["fields"].items()]
+        scope, block = spec["blocks"]
+        self.scope = _stream_checks(scope)
+        self.block = _stream_checks(block)
+        self.fallback_scope = _stream_checks(spec["blocks_fallback"])
+        self.begin(None)
+
+    def begin(self, encoding):
+        """Новый разбор; вызывается и при повторе загрузки, поэтому сбрасывает всё прочитанное"""
+        from lxml import etree
+        self._parser = etree.HTMLParser(target=self, encoding=encoding or "utf-8")
+        self.values = {}
+        self.blocks = None  # [имя, части текста, закрыт] в порядке открытия; None — область ещё не найдена
+        self._fallback_blocks = None
+        self._open = []  # по открытым тегам: сборщики текста, начатые на этом теге
+        self._collectors = []
+        self._pending = []
+        self._skip_text = 0
+        self._emitted = 0
+        self._scope_closed = False
+        self.done = False
+
+    def feed(self, chunk):
+        if not self.done:
+            self._parser.feed(chunk)
+        return self.done
+
+    def finish(self):
+        """Конец ответа: закрывает разбор и возвращает {"title", "date", "content"}, как extract_article_content"""
+        if not self.done:
+            try:
+                self._parser.close()
+            except Exception as e:
+                logger.debug("Незавершённый HTML статьи: %s", e)
+        # Поле, чей тег не закрылся до обрыва, ещё хранит список частей
+        values = {name: "".join(value) if isinstance(value, list) else value for name, value in self.values.items()}
+        blocks = self.blocks if self.blocks is not None else self._fallback_blocks
+        title = values.get("title", "Без заголовка")
+        date = values.get("date", "")
+        if blocks is None:
+            return {"title": title, "date": date, "content": None}
+        return {"title": title, "date": date, "content": _format_blocks((name, " ".join(parts)) for name, parts, _ in blocks)}
+
+    def ready_blocks(self):
+        """Уже закрытые блоки области, ещё не выданные: можно показывать, не дожидаясь конца страницы"""
+        ready = []
+        while self.blocks is not None and self._emitted < len(self.blocks) and self.blocks[self._emitted][2]:
+            name, parts, _ = self.blocks[self._emitted]
+            ready.append((name, " ".join(parts)))
+            self._emitted += 1
+        return ready
+
+    def _flush(self):
+        if self._pending:
+            text = "".join(self._pending).strip()
+            self._pending = []
+            if text and not self._skip_text:
+                for parts in self._collectors:
+                    parts.append(text)
+
+    # Интерфейс target для lxml
+
+    def start(self, tag, attrib):
+        self._flush()
+        started = []
+        if tag in self.SKIP_TEXT:
+            self._skip_text += 1
+        for name, checks, what in self.fields:
+            if not self.done and name not in self.values and _start_matches(checks, tag, attrib):
+                if what.startswith("@"):
+                    self.values[name] = attrib.get(what[1:], "")
+                else:
+                    parts = []
+                    self.values[name] = parts
+                    started.append(("field", name, parts))
+        if self.blocks is not None:
+            # После закрытия области блоки не собираются, даже если чтение идёт дальше ради полей
+            if not self._scope_closed and _start_matches(self.block, tag, attrib):
+                entry = [tag, [], False]
+                self.blocks.append(entry)
+                started.append(("block", entry, entry[1]))
+        elif _start_matches(self.scope, tag, attrib):
+            self.blocks = []
+            self._fallback_blocks = None
+            # Сборщики запасной области больше не нужны
+            self._collectors = [parts for kind, _, parts in self._all_started() if kind == "field"]
+            started.append(("scope", None, None))
+        elif self._fallback_blocks is not None:
+            if _start_matches(self.block, tag, attrib):
+                entry = [tag, [], False]
+                self._fallback_blocks.append(entry)
+                started.append(("fallback", entry, entry[1]))
+        elif _start_matches(self.fallback_scope, tag, attrib):
+            self._fallback_blocks = []
+        self._collectors.extend(parts for _, _, parts in started if parts is not None)
+        self._open.append((tag, started))
+
+    def _all_started(self):
+        for _, started in self._open:
+            yield from started
+
+    def end(self, tag):
+        self._flush()
+        if not self._open:
+            return
+        tag, started = self._open.pop()
+        if tag in self.SKIP_TEXT:
+            self._skip_text -= 1
+        if started:
+            # Сравнение по identity: пустые списки частей равны между собой
+            finished = {id(parts) for _, _, parts in started}
+            self._collectors = [parts for parts in self._collectors if id(parts) not in finished]
+        for kind, target, parts in started:
+            if kind == "field":
+                self.values[target] = "".join(parts)
+            elif kind in ("block", "fallback"):
+                target[2] = True
+            elif kind == "scope":
+                self._scope_closed = True
+        if self._scope_closed:
+            # Текстовое поле до закрытия своего тега хранит список частей
+            self.done = all(isinstance(self.values.get(name), str) for name, _, _ in self.fields)
+
+    def data(self, data):
+        if self._collectors:
+            self._pending.append(data)
+
+    def close(self):
+        self._flush()
+
+def _format_blocks(blocks):
+    result = [f"\n \n🔹 {text}\n" if name == "strong" else text for name, text in blocks if text]
+    return ''.join(dict.fromkeys(result))
+
+def _absolute_url(url, base_url):
+    return url if url.startswith("http") else base_url.rstrip("/") + "/" + url.lstrip("/")
+
+def extract_search_results(html, base_url, limit, features=PARSER_FEATURES):
+    """Результаты поиска из <ol class="results">"""
+    articles = []
+    for record in engine.extract("search", html, features)[:limit]:
+        articles.append({
+            "title": record.get("title") or "Без заголовка",
+            "content": record["content"],
+            "date": record.get("date") or datetime.now().isoformat(),
+            "emoji": "📰",
+            "url": _absolute_url(record.get("url", ""), base_url)
+        })
+    return articles
+
+def extract_latest_articles(html, base_url, limit, features=PARSER_FEATURES):
+    """Последние статьи с главной страницы: <ul class="posts-list">, при новой вёрстке — запасной разбор ссылок"""
+    articles = []
+    for record in engine.extract("homepage", html, features)[:limit]:
+        articles.append({
+            "title": record.get("title", "Без заголовка"),
+            "content": "",  # Краткого описания в списке на главной нет
+            "date": record.get("date", datetime.now().strftime('%d.%m.%Y')),
+            "emoji": "📰",
+            "url": _absolute_url(record.get("url", ""), base_url)
+        })
+    if articles:
+        logger.debug("Найдено %d статей в <ul class='posts-list'>", len(articles))
+        return articles
+    logger.info("Ищем статьи в новой структуре сайта")
+    return _extract_fallback_links(html, base_url, limit, features)
+
+def _is_article_link(tag):
+    href = tag.get("href") if tag.name == "a" else None
+    return bool(href) and any(keyword in href for keyword in ['/publish/', '/article/', '/news/']) \
+        and not any(skip in href for skip in ['search', 'group', 'recent_publications'])
+
+def _extract_fallback_links(html, base_url, limit, features):
+    """Эвристика для незнакомой вёрстки главной: ссылки на статьи, дата и текст — из их родителя"""
+    soup, article_links, generic_links = engine.select_first(html, FALLBACK_LINK_SELECTORS, _is_article_link, features)
+    if not article_links:
+        article_links = generic_links
+        logger.debug("Найдены общие ссылки на статьи: %d", len(article_links))
+
+    articles = []
+    processed_urls = set()
+    for link in article_links[:limit * 2]:
+        if len(articles) >= limit:
+            break
+
+        href = link.get('href', '')
+        if not href or href in processed_urls:
+            continue
+
+        href = _absolute_url(href, base_url)
+        processed_urls.add(href)
+
+        title = link.get_text(strip=True)
+        if not title:
+            continue
+
+        date = ""
+        content = ""
+        parent = link.parent
+        if parent:
+            date_elem = parent.find('time') or parent.find(class_='date') or parent.find('span', string=lambda text: text and any(month in text for month in ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня']))
+            if date_elem:
+                date = date_elem.get_text(strip=True)
+            content_parts = [text for text in (node.strip() for node in parent.find_all(string=True)) if text and text != title and len(text) > 10]
+            content = ' '.join(content_parts[:2])
+
+        articles.append({
+            "title": title,
+            "content": content[:200] + "..." if len(content) > 200 else content,
+            "date": date or datetime.now().isoformat(),
+            "emoji": "📰",
+            "url": href
+        })
+
+    if not articles:
+        for i, link in enumerate(soup.find_all('a', href=True)[:5]):
+            logger.debug("%d. %s - %s", i + 1, link.get('href'), link.get_text(strip=True)[:50])
+    return articles
+
+def extract_topics(html, base_url, features=PARSER_FEATURES):
+    """Список тем из <ul class='tax-code__list'> (не больше 10)"""
+    return [
+        {"title": record["title"] or "Без названия", "url": _absolute_url(record["url"], base_url)}
+        for record in engine.extract("topics", html, features)[:10]
+    ]
+
+def extract_topic_articles(html, base_url, features=PARSER_FEATURES, limit=MAX_ARTICLES):
+    """Статьи со страницы темы (limit=None — все статьи страницы)"""
+    date = datetime.now().strftime('%d.%m.%Y')
+    return [
+        {
+            "title": record.get("title", "Без заголовка"),
+            "content": "",
+            "date": date,
+            "emoji": "📰",
+            "url": _absolute_url(record["url"], base_url)
+        }
+        for record in engine.extract("topic", html, features)[:limit]
+    ]
+
+# Подписи ссылки на следующую страницу, если номер страницы в адресе не указан
+NEXT_PAGE_LABELS = {"»", "›", "→", "далее", "следующая", "keyingi", "next"}
+
+def _page_number(url):
+    try:
+        return int(parse_qs(urlsplit(url).query).get("page", ["1"])[0])
+    except ValueError:
+        return 1
+
+def extract_next_page(html, page_url, features=PARSER_FEATURES):
+    """Адрес следующей страницы списка из блока .pagination; None — страница последняя"""
+    wanted = _page_number(page_url) + 1
+    for record in engine.extract("pagination", html, features):
+        url = urljoin(page_url, record.get("url", ""))
+        if _page_number(url) == wanted or record.get("label", "").lower() in NEXT_PAGE_LABELS:
+            return url
+    return None
+
+def extract_list_page(html, source, page_url, base_url, features=PARSER_FEATURES):
+    """Все статьи одной страницы поиска (source="search") или темы ("topic") и адрес следующей страницы"""
+    if source == "search":
+        articles = extract_search_results(html, base_url, None, features)
+    else:
+        articles = extract_topic_articles(html, base_url, features, limit=None)
+    return {"articles": articles, "next_url": extract_next_page(html, page_url, features)}
+
+def extract_article_content(html, features=PARSER_FEATURES):
+    """Заголовок, дата и текст статьи; content равен None, если блок с текстом не найден"""
+    record = engine.extract("article", html, features)[0]
+    title = record.get("title", "Без заголовка")
+    date = record.get("date", "")
+    if "blocks" not in record:
+        return {"title": title, "date": date, "content": None}
+    return {"title": title, "date": date, "content": _format_blocks(record["blocks"])}
+
+class KadrovikNewsParser:
+    def __init__(self, base_url="https://kadrovik.uz"):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        }
+        self.news_cache = []
+
+    async def get_page_content(self, url):
+        """Получает содержимое страницы"""
+        try:
+            # Общий клиент: пул соединений, повторы и выключатель класса адреса
+            return await fetch_text(url, timeout=15, headers=self.headers)
+        except CircuitOpenError:
+            logger.warning(f"Сайт недоступен, запрос к {url} не отправлен")
+            return None
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"Ошибка получения страницы {url}: {e.status}")
+            return None
+        except asyncio.TimeoutError:
+            logger.error(f"Таймаут при запросе к {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Ошибка при запросе к {url}: {e}")
+            return None
+
+    def clean_text(self, text):
+        """Очищает текст от лишних символов"""
+        if not text:
+            return ""
+        text = re.sub(r'\s+', ' ', text.strip())
+        text = re.sub(r'[^\w\s\-.,!?():;]', '', text)
+        return text
+
+    def parse_main_page(self, html_content):
+        """Парсит главную страницу и извлекает новости"""
+        return extract_latest_articles(html_content, self.base_url, 10)
+
+    async def get_news(self):
+        """Получает список новостей"""
+        html_content = await self.get_page_content(self.base_url)
+        if html_content:
+            news_list = await run_parser(extract_latest_articles, html_content, self.base_url, 10)
+            self.news_cache = news_list
+            return news_list
+        return []
+
+    async def get_article_content(self, url):
+        """Получает полный текст статьи; None, если страницу не удалось загрузить или текста на ней нет"""
+        html_content = await self.get_page_content(url)
+        if not html_content:
+            return None
+        article = await run_parser(extract_article_content, html_content)
+        return article["content"]
\ No newline at end of file
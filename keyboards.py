@@ -1,25 +1,44 @@
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-from aiogram import types
-
-def get_main_menu():
-    builder = InlineKeyboardBuilder()
-    builder.row(
-        types.InlineKeyboardButton(text="📚 Все темы 34", callback_data="kadrovik_latest")
-    )
-    builder.row(
-        types.InlineKeyboardButton(text="📚 Рубрики", callback_data="kadrovik_news"),
-        types.InlineKeyboardButton(text="🔍 Поиск", callback_data="kadrovik_search")
-    )
-    builder.row(
-        types.InlineKeyboardButton(text="🗞️ Новости", callback_data="news"),
-        types.InlineKeyboardButton(text="ℹ️ Помощь", callback_data="help")
-    )
-    builder.row(
-        types.InlineKeyboardButton(text="🤖 О боте", callback_data="about")
-    )
-    return builder.as_markup()
-
-def get_back_to_main_menu():
-    builder = InlineKeyboardBuilder()
-    builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
+from functools import cache
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram import types
+from config import RUBRIKI
+
+# Постоянные клавиатуры строятся один раз за процесс и отдаются всем пользователям
+
+@cache
+def get_main_menu():
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        types.InlineKeyboardButton(text="📚 Все темы 34", callback_data="kadrovik_latest")
+    )
+    builder.row(
+        types.InlineKeyboardButton(text="📚 Рубрики", callback_data="kadrovik_news"),
+        types.InlineKeyboardButton(text="🔍 Поиск", callback_data="kadrovik_search")
+    )
+    builder.row(
+        types.InlineKeyboardButton(text="🗞️ Новости", callback_data="news"),
+        types.InlineKeyboardButton(text="ℹ️ Помощь", callback_data="help")
+    )
+    builder.row(
+        types.InlineKeyboardButton(text="🔔 Подписки", callback_data="subscriptions"),
+        types.InlineKeyboardButton(text="🤖 О боте", callback_data="about")
+    )
+    return builder.as_markup()
+
+@cache
+def get_back_to_main_menu():
+    builder = InlineKeyboardBuilder()
+    builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
+    return builder.as_markup()
+
+@cache
+def get_rubriki_menu():
+    builder = InlineKeyboardBuilder()
+    for rubrika_name, rubrika_slug in RUBRIKI.items():
+        builder.add(types.InlineKeyboardButton(
+            text=f"📂 {rubrika_name}",
+            callback_data=f"rubrika_{rubrika_slug}"
+        ))
+    builder.add(types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu"))
+    builder.adjust(2)
     return builder.as_markup()
\ No newline at end of file
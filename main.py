@@ -1,50 +1,183 @@
-import asyncio
-import logging
-from aiogram import Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from config import bot, BOT_TOKEN
-from handlers.registration import register_registration_handlers
-from handlers.news import register_news_handlers
-from handlers.search import register_search_handlers
-from handlers.rubrics import register_rubrics_handlers
-from handlers.general import register_general_handlers
-from handlers.articles import register_articles_handlers  # Добавлен импорт
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
-
-# Инициализация диспетчера
-dp = Dispatcher(storage=MemoryStorage())
-
-async def main():
-    logger.info("Запуск бота...")
-    try:
-        # Регистрация обработчиков
-        register_registration_handlers(dp)
-        register_news_handlers(dp)
-        register_search_handlers(dp)
-        register_rubrics_handlers(dp)
-        register_general_handlers(dp)
-        register_articles_handlers(dp)  # Добавлена регистрация
-
-        # Удаляем webhook, если был установлен
-        await bot.delete_webhook(drop_pending_updates=True)
-        
-        # Запускаем polling
-        await dp.start_polling(bot)
-    except Exception as e:
-        logger.error(f"Ошибка при запуске бота: {e}")
-    finally:
-        await bot.session.close()
-
-if __name__ == "__main__":
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        logger.info("Бот остановлен пользователем")
-    except Exception as e:
-        logger.error(f"Критическая ошибка: {e}")
\ No newline at end of file
+import asyncio
+import logging
+import signal
+from aiohttp import web
+from aiogram import Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from config import (
+    CRAWLER_ENABLED, SESSION_CLEANUP_INTERVAL,
+    METRICS_ENABLED, METRICS_HOST, METRICS_PORT, LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_EVERY,
+    BOT_MODE, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBAPP_HOST, WEBAPP_PORT
+)
+from context import app
+from utils.http_client import get_session, close_session, get_breaker_stats
+from utils.storage import cache_store, run_cache_flusher, get_cache_stats
+from utils.parsing import shutdown_executor, warm_up_parser
+from utils.crawler import run_crawler
+from utils.search_index import search_index
+from user_manager import user_manager
+from utils.metrics import start_metrics_server
+from utils.log import setup_logging, stop_logging
+from utils.outbound import outbound
+from utils.subscriptions import subscription_store, run_notifier, get_subscription_stats
+from utils.registry import registry
+from utils.render import render_cache
+from utils.prefetch import prefetcher
+from utils.singleflight import scrapes
+from utils.snapshot import save_snapshot, load_snapshot
+from middlewares import CorrelationIdMiddleware, HandlerTimingMiddleware, TelegramTimingMiddleware, OutboundRateLimitMiddleware
+from handlers.registration import register_registration_handlers
+from handlers.news import register_news_handlers
+from handlers.search import register_search_handlers
+from handlers.rubrics import register_rubrics_handlers
+from handlers.general import register_general_handlers
+from handlers.articles import register_articles_handlers  # Добавлен импорт
+from handlers.subscriptions import register_subscriptions_handlers
+from handlers.pages import register_pages_handlers
+
+# Настройка логирования: запись уходит в очередь, в stderr её пишет отдельный поток
+setup_logging(LOG_LEVEL, json_format=LOG_FORMAT == "json", debug_sample_every=LOG_DEBUG_SAMPLE_EVERY)
+logger = logging.getLogger(__name__)
+
+# Инициализация диспетчера
+dp = Dispatcher(storage=MemoryStorage())
+
+async def run_polling():
+    # Удаляем webhook, если был установлен
+    await app.bot.delete_webhook(drop_pending_updates=True)
+    
+    # Запускаем polling
+    await dp.start_polling(app.bot)
+
+async def handle_health(request):
+    """Проверка живости для балансировщика"""
+    return web.json_response({
+        "status": "ok",
+        "mode": "webhook",
+        "cache": get_cache_stats(),
+        "sessions": app.user_sessions.get_metrics(),
+        "outbound": outbound.stats,
+        "breakers": get_breaker_stats(),
+        "scrapes": scrapes.get_stats(),
+        "prefetch": prefetcher.get_stats(),
+        "render": dict(render_cache.stats, screens=len(render_cache)),
+        "notifications": await get_subscription_stats()
+    })
+
+def create_webhook_app():
+    """aiohttp-приложение: приём обновлений с проверкой секрета и /health"""
+    web_app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=app.bot, secret_token=WEBHOOK_SECRET).register(web_app, path=WEBHOOK_PATH)
+    web_app.router.add_get("/health", handle_health)
+    setup_application(web_app, dp, bot=app.bot)
+    return web_app
+
+async def run_webhook():
+    runner = web.AppRunner(create_webhook_app())
+    await runner.setup()
+    site = web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT)
+    await site.start()
+    logger.info(f"Webhook-сервер слушает {WEBAPP_HOST}:{WEBAPP_PORT}{WEBHOOK_PATH}")
+
+    # Без WEBHOOK_URL сервер работает локально: обновления можно присылать POST-запросами вручную
+    if WEBHOOK_URL:
+        await app.bot.set_webhook(
+            WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET,
+            drop_pending_updates=True
+        )
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    try:
+        await stop_event.wait()
+        logger.info("Получен сигнал остановки, завершаем webhook-сервер...")
+    finally:
+        # Дожидаемся обработки уже принятых обновлений и закрываем приложение
+        await runner.cleanup()
+
+async def main():
+    logger.info("Запуск бота...")
+    app.check_settings()
+    background_tasks = []
+    metrics_runner = None
+    try:
+        # Регистрация обработчиков
+        register_registration_handlers(dp)
+        register_news_handlers(dp)
+        register_search_handlers(dp)
+        register_rubrics_handlers(dp)
+        register_general_handlers(dp)
+        register_articles_handlers(dp)  # Добавлена регистрация
+        register_subscriptions_handlers(dp)
+        register_pages_handlers(dp)
+
+        dp.update.outer_middleware(CorrelationIdMiddleware())
+
+        # Все исходящие вызовы — через очередь с лимитами Telegram (внешний слой, время API меряется внутри)
+        app.bot.session.middleware(OutboundRateLimitMiddleware())
+
+        # Метрики: время обработчиков и вызовов Telegram API
+        dp.message.middleware(HandlerTimingMiddleware())
+        dp.callback_query.middleware(HandlerTimingMiddleware())
+        app.bot.session.middleware(TelegramTimingMiddleware())
+        if METRICS_ENABLED:
+            metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+            logger.info(f"Метрики: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+        # Тёплый старт: кэш, сессии и реестр из снимка предыдущего процесса
+        await load_snapshot()
+        await user_manager.load()
+        background_tasks.append(asyncio.create_task(user_manager.run_writer()))
+
+        # Общий пул HTTP-соединений к kadrovik.uz живёт всё время работы бота
+        get_session()
+        # bs4 и lxml догружаются в пуле разбора, пока бот уже принимает обновления
+        background_tasks.append(asyncio.create_task(warm_up_parser()))
+        background_tasks.append(asyncio.create_task(run_cache_flusher()))
+        background_tasks.append(asyncio.create_task(app.user_sessions.run_janitor(SESSION_CLEANUP_INTERVAL)))
+        # Рассылка уведомлений; незавершённые до перезапуска задания продолжаются
+        background_tasks.append(asyncio.create_task(run_notifier()))
+        if CRAWLER_ENABLED:
+            # Держим кэш тёплым, чтобы обработчики не ждали сайт
+            background_tasks.append(asyncio.create_task(run_crawler()))
+
+        if BOT_MODE == "webhook":
+            await run_webhook()
+        else:
+            await run_polling()
+    except Exception as e:
+        logger.error(f"Ошибка при запуске бота: {e}")
+    finally:
+        # Останавливаем фоновые задачи (сборщик кэша сбрасывает данные на диск при отмене)
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await prefetcher.cancel_all()
+        logger.info(f"Статистика кэша: {get_cache_stats()}")
+        logger.info(f"Статистика сессий: {app.user_sessions.get_metrics()}")
+        await save_snapshot()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await close_session()
+        shutdown_executor()
+        cache_store.close()
+        search_index.close()
+        app.user_sessions.close()
+        subscription_store.close()
+        registry.close()
+        user_manager.close()
+        await app.bot.session.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Бот остановлен пользователем")
+    except Exception as e:
+        logger.error(f"Критическая ошибка: {e}")
+    finally:
+        stop_logging()
\ No newline at end of file
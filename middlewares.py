@@ -0,0 +1,48 @@
+import time
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from utils.metrics import HANDLER_LATENCY, TELEGRAM_LATENCY
+from utils.log import correlation_id, new_correlation_id
+from utils.outbound import outbound
+
+class CorrelationIdMiddleware(BaseMiddleware):
+    """Назначает каждому обновлению свой идентификатор: по нему в логах собираются все записи запроса"""
+
+    async def __call__(self, handler, event, data):
+        token = correlation_id.set(correlation_id.get())
+        new_correlation_id(f"u{event.update_id}-")
+        try:
+            return await handler(event, data)
+        finally:
+            correlation_id.reset(token)
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """Замеряет время работы обработчика и пишет его в гистограмму по имени обработчика"""
+
+    async def __call__(self, handler, event, data):
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            handler_object = data.get("handler")
+            name = handler_object.callback.__name__ if handler_object else "unknown"
+            HANDLER_LATENCY.observe(time.perf_counter() - start, handler=name)
+
+class TelegramTimingMiddleware(BaseRequestMiddleware):
+    """Замеряет время вызовов Telegram Bot API"""
+
+    async def __call__(self, make_request, bot, method):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await make_request(bot, method)
+            status = "ok"
+            return response
+        finally:
+            TELEGRAM_LATENCY.observe(time.perf_counter() - start, method=type(method).__name__, status=status)
+
+class OutboundRateLimitMiddleware(BaseRequestMiddleware):
+    """Пропускает все вызовы Telegram API через общую очередь исходящих с лимитами и повторами"""
+
+    async def __call__(self, make_request, bot, method):
+        return await outbound.send(make_request, bot, method)
\ No newline at end of file
@@ -1,253 +1,167 @@
-import aiohttp
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import time
-from utils.storage import load_cache, save_cache
-
-async def fetch_articles_from_site(query=None, lang="ru", limit=10):
-    """Получение списка статей с сайта Kadrovik.uz"""
-    start_time = time.time()
-    base_url = "https://kadrovik.uz/" if lang == "ru" else "https://kadrovik.uz/uz/"
-    url = base_url if not query else f"{base_url}search?q={query}"
-    print(f"{datetime.now()}: Начало парсинга URL: {url}")
-    
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=6)) as response:
-                response.raise_for_status()
-                text = await response.text()
-                soup = BeautifulSoup(text, "html.parser")
-
-        articles = []
-        
-        if query:
-            # Для поиска используем старые селекторы
-            results_list = soup.select("ol.results li")
-            if results_list:
-                print(f"{datetime.now()}: Найдена страница поиска со старой структурой")
-                for li in results_list[:limit]:
-                    a_tag = li.find('a')
-                    span_date = li.find('span', class_='date')
-
-                    url_link = a_tag['href'] if a_tag else ''
-                    title = a_tag.get_text(strip=True) if a_tag else ''
-                    date = span_date.get_text(strip=True) if span_date else ''
-                          
-                    if a_tag:
-                        a_tag.extract()
-                    if span_date:
-                        span_date.extract()
-
-                    text_content = li.get_text(separator=' ', strip=True)
-
-                    if not url_link.startswith("http"):
-                        url_link = base_url.rstrip("/") + "/" + url_link.lstrip("/")
-
-                    articles.append({
-                        "title": title or "Без заголовка",
-                        "content": text_content or "",
-                        "date": date or datetime.now().isoformat(),
-                        "emoji": "📰",
-                        "url": url_link
-                    })
-        else:
-            # Для главной страницы парсим <ul class="posts-list">
-            print(f"{datetime.now()}: Парсим главную страницу, ищем <ul class='posts-list'>")
-            posts_list = soup.select("ul.posts-list li.post-card-wrapper, ul.posts-list li.post-card--horizontal-wrapper")
-            if posts_list:
-                print(f"{datetime.now()}: Найдено {len(posts_list)} статей в <ul class='posts-list'>")
-                for item in posts_list[:limit]:
-                    a_tag = item.find('a', href=True)
-                    title_tag = item.find('h4', class_='post-card__title')
-                    date_tag = item.find('time', class_='longread-post__time-published')
-
-                    url_link = a_tag['href'] if a_tag else ''
-                    title = title_tag.get_text(strip=True) if title_tag else 'Без заголовка'
-                    date = date_tag.get_text(strip=True) if date_tag else datetime.now().strftime('%d.%m.%Y')
-
-                    if not url_link.startswith("http"):
-                        url_link = base_url.rstrip("/") + "/" + url_link.lstrip("/")
-
-                    articles.append({
-                        "title": title,
-                        "content": "",  # Краткое описание не извлекаем, так как его нет в HTML
-                        "date": date,
-                        "emoji": "📰",
-                        "url": url_link
-                    })
-            
-            # Резервная логика для новой структуры сайта
-            if not articles:
-                print(f"{datetime.now()}: Ищем статьи в новой структуре сайта")
-                article_links = []
-                potential_selectors = [
-                    "a[href*='/publish/']",
-                    "a[href*='/article/']",
-                    ".article-link",
-                    ".publication-link",
-                    "article a",
-                    ".content a[href]",
-                    "main a[href]"
-                ]
-                
-                for selector in potential_selectors:
-                    links = soup.select(selector)
-                    if links:
-                        print(f"{datetime.now()}: Найдены ссылки с селектором: {selector} ({len(links)} штук)")
-                        article_links.extend(links)
-                        break
-                
-                if not article_links:
-                    all_links = soup.find_all('a', href=True)
-                    article_links = [
-                        link for link in all_links 
-                        if any(keyword in link['href'] for keyword in ['/publish/', '/article/', '/news/'])
-                        and not any(skip in link['href'] for skip in ['search', 'group', 'recent_publications'])
-                    ]
-                    print(f"{datetime.now()}: Найдены общие ссылки на статьи: {len(article_links)}")
-                
-                processed_urls = set()
-                for link in article_links[:limit*2]:
-                    if len(articles) >= limit:
-                        break
-                        
-                    href = link.get('href', '')
-                    if not href or href in processed_urls:
-                        continue
-                        
-                    if not href.startswith("http"):
-                        href = base_url.rstrip("/") + "/" + href.lstrip("/")
-                    
-                    processed_urls.add(href)
-                    
-                    title = link.get_text(strip=True)
-                    if not title:
-                        continue
-                    
-                    date = ""
-                    parent = link.parent
-                    if parent:
-                        date_elem = parent.find('time') or parent.find(class_='date') or parent.find('span', string=lambda text: text and any(month in text for month in ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня']))
-                        if date_elem:
-                            date = date_elem.get_text(strip=True)
-                    
-                    content = ""
-                    if parent:
-                        text_nodes = parent.find_all(text=True)
-                        content_parts = []
-                        for text_node in text_nodes:
-                            text = text_node.strip()
-                            if text and text != title and len(text) > 10:
-                                content_parts.append(text)
-                        content = ' '.join(content_parts[:2])
-                    
-                    articles.append({
-                        "title": title,
-                        "content": content[:200] + "..." if len(content) > 200 else content,
-                        "date": date or datetime.now().isoformat(),
-                        "emoji": "📰",
-                        "url": href
-                    })
-
-        print(f"{datetime.now()}: Найдено статей перед срезом: {len(articles)}")
-        articles = articles[:limit]
-        print(f"{datetime.now()}: Возвращено статей после среза: {len(articles)}")
-        
-        if not articles:
-            print(f"{datetime.now()}: Не удалось найти статьи по URL: {url}")
-            all_links = soup.find_all('a', href=True)[:5]
-            for i, link in enumerate(all_links):
-                print(f"{datetime.now()}: {i+1}. {link.get('href')} - {link.get_text(strip=True)[:50]}")
-        
-        print(f"{datetime.now()}: Парсинг завершен. Время: {time.time() - start_time:.2f} сек. Найдено статей: {len(articles)}")
-        
-        cache = load_cache()
-        cache_key = f"latest_{lang}" if not query else f"search_{query}_{lang}"
-        cache[cache_key] = {
-            "timestamp": datetime.now().isoformat(),
-            "data": articles
-        }
-        save_cache(cache)
-        return articles
-    except Exception as e:
-        print(f"{datetime.now()}: Ошибка при парсинге сайта: {e}. Время: {time.time() - start_time:.2f} сек")
-        cache = load_cache()
-        cache_key = f"latest_{lang}" if not query else f"search_{query}_{lang}"
-        return cache.get(cache_key, {}).get("data", [])
-
-async def fetch_article_content(url):
-    """Парсер с правильными переносами строк после emoji и абзацев"""
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=10) as response:
-                response.raise_for_status()
-                html = await response.text()
-        
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        title = soup.find('h1').get_text(strip=True) if soup.find('h1') else "Без заголовка"
-        date_elem = soup.find('time', {'class': 'longread-post__time-published'})
-        date = date_elem['datetime'] if date_elem else ""
-        
-        content_block = soup.find('section', {'class': 'longread-block'}) or soup.find('body')
-        
-        if not content_block:
-            return f"📰 {title}\n📅 {date}\n\nНе удалось найти контент."
-        
-        elements = content_block.find_all(['p', 'strong'])
-        result = []
-        
-        for element in elements:
-            text = element.get_text(' ', strip=True)
-            if text:
-                if element.name == 'strong':
-                    result.append(f"\n \n🔹 {text}\n")
-                else:
-                    result.append(f"{text}")
-        
-        content = ''.join(dict.fromkeys(result))
-        
-        return content if len(content) > 50 else "Не удалось извлечь текст."
-    
-    except Exception as e:
-        print(f"Ошибка: {e}")
-        return None
-
-async def search_articles(query, lang):
-    """Поиск статей по запросу"""
-    cache = load_cache()
-    cache_key = f"search_{query}_{lang}"
-    
-    if cache_key in cache:
-        entry = cache[cache_key]
-        timestamp = entry.get("timestamp")
-        if timestamp and (datetime.now() - datetime.fromisoformat(timestamp)) < timedelta(hours=24):
-            print(f"{datetime.now()}: Используем кэшированные данные для запроса: {query}")
-            return entry["data"]
-
-    print(f"{datetime.now()}: Парсинг сайта для запроса: {query}")
-    articles = await fetch_articles_from_site(query, lang)
-    return articles
-
-async def get_latest_articles(lang):
-    """Получение последних статей"""
-    cache = load_cache()
-    cache_key = f"latest_{lang}"
-    
-    if cache_key in cache:
-        entry = cache[cache_key]
-        timestamp = entry.get("timestamp")
-        if timestamp and (datetime.now() - datetime.fromisoformat(timestamp)) < timedelta(hours=24):
-            print(f"{datetime.now()}: Используем кэшированные данные для последних статей ({lang})")
-            return entry["data"]
-
-    print(f"{datetime.now()}: Парсинг сайта для последних статей ({lang})")
-    articles = await fetch_articles_from_site(lang=lang, limit=5)  # Лимит 5 для актуальных статей
+import logging
+import time
+from utils.storage import get_cache_entry, get_fresh_data, get_stale_data, set_cache_entry, get_cached_article, save_cached_article, mark_article_fresh
+from utils.http_client import fetch_text, fetch_conditional, fetch_streaming, circuit_open, retry_in
+from utils.parsing import run_parser
+from utils.search_index import index_articles, index_article_body, search_local
+from config import (
+    ARTICLE_CACHE_FRESH, ARTICLE_STREAMING, ARTICLE_MAX_BYTES, ARTICLE_STREAM_CHUNK, ARTICLE_STREAM_DRAIN,
+    MAX_ARTICLES, SEARCH_INDEX_MIN_HITS, KADROVIK_BASE_URL
+)
+from utils.singleflight import scrapes
+from utils.metrics import CACHE_REQUESTS
+from kadrovik_parser import extract_list_page, extract_latest_articles, extract_article_content, StreamingArticleExtractor
+from utils.pagination import page_cache_key, search_url
+
+logger = logging.getLogger(__name__)
+
+async def fetch_articles_from_site(query=None, lang="ru", limit=10):
+    """Получение списка статей с сайта Kadrovik.uz (одновременные одинаковые запросы объединяются)"""
+    return await scrapes.do(("articles", lang, query, limit), _fetch_articles_from_site, query, lang, limit)
+
+async def _fetch_articles_from_site(query, lang, limit):
+    start_time = time.time()
+    base_url = KADROVIK_BASE_URL if lang == "ru" else f"{KADROVIK_BASE_URL}uz/"
+    url = base_url if not query else search_url(query, lang)
+    logger.debug("Начало парсинга URL: %s", url)
+    
+    try:
+        text = await fetch_text(url, timeout=6)
+        
+        if query:
+            # Страница целиком (со ссылкой на следующую) нужна для кнопки «Далее» после первого экрана
+            page = await run_parser(extract_list_page, text, "search", url, base_url)
+            await set_cache_entry(page_cache_key(url), page)
+            articles = page["articles"]
+        else:
+            articles = await run_parser(extract_latest_articles, text, base_url, limit)
+
+        articles = articles[:limit]
+        
+        if not articles:
+            logger.warning("Не удалось найти статьи по URL: %s", url)
+        
+        elapsed = time.time() - start_time
+        logger.info(
+            "Парсинг завершен. Время: %.2f сек. Найдено статей: %d", elapsed, len(articles),
+            extra={"url": url, "duration": round(elapsed, 3), "articles": len(articles)}
+        )
+        
+        cache_key = f"latest_{lang}" if not query else f"search_{query}_{lang}"
+        await set_cache_entry(cache_key, articles)
+        await index_articles(articles)
+        return articles
+    except Exception as e:
+        logger.error("Ошибка при парсинге сайта: %s. Время: %.2f сек", e, time.time() - start_time, extra={"url": url})
+        cache_key = f"latest_{lang}" if not query else f"search_{query}_{lang}"
+        entry = await get_cache_entry(cache_key)
+        return entry["data"] if entry else []
+
+async def fetch_article_content(url):
+    """Получение текста статьи (одновременные запросы одной статьи объединяются)"""
+    return await scrapes.do(("article", url), _fetch_article_content, url)
+
+async def _fetch_article_content(url):
+    """Парсер с правильными переносами строк после emoji и абзацев"""
+    cached = await get_cached_article(url)
+    if cached and time.time() - cached["fetched_at"] < ARTICLE_CACHE_FRESH:
+        CACHE_REQUESTS.inc(family="article", result="hit")
+        return cached["content"]
+    CACHE_REQUESTS.inc(family="article", result="stale" if cached else "miss")
+    if cached and circuit_open("article"):
+        # Сайт недоступен: сразу отдаём устаревшую копию, обновит её одна фоновая проба
+        scrapes.revalidate(("article", url), retry_in("article"), _download_article, url, cached)
+        return cached["content"]
+    return await _download_article(url, cached)
+
+async def _download_article(url, cached):
+    try:
+        etag = cached["etag"] if cached else None
+        last_modified = cached["last_modified"] if cached else None
+        if ARTICLE_STREAMING:
+            status, article, etag, last_modified = await _stream_article(url, etag, last_modified)
+        else:
+            status, html, etag, last_modified = await fetch_conditional(url, timeout=10, etag=etag, last_modified=last_modified)
+        if status == 304 and cached:
+            logger.debug("Статья не изменилась (304): %s", url)
+            await mark_article_fresh(url)
+            CACHE_REQUESTS.inc(family="article", result="revalidated")
+            return cached["content"]
+        
+        if not ARTICLE_STREAMING:
+            article = await run_parser(extract_article_content, html)
+        
+        if article["content"] is None:
+            return f"📰 {article['title']}\n📅 {article['date']}\n\nНе удалось найти контент."
+        
+        content = article["content"]
+        if len(content) <= 50:
+            return "Не удалось извлечь текст."
+        await save_cached_article(url, content, etag, last_modified)
+        await index_article_body(url, article["title"], article["date"], content)
+        return content
+    
+    except Exception as e:
+        logger.error("Ошибка загрузки статьи: %s", e, extra={"url": url})
+        # Если сайт недоступен, отдаём устаревшую копию из кэша
+        return cached["content"] if cached else None
+
+async def _stream_article(url, etag, last_modified):
+    """Загрузка статьи с разбором по кускам: дерево страницы не строится, хвост после текста статьи не скачивается.
+    Разбор куска в lxml короче его чтения из сети, поэтому идёт прямо в цикле событий, без пула."""
+    extractor = StreamingArticleExtractor()
+    status, etag, last_modified, read, truncated = await fetch_streaming(
+        url, timeout=10, sink=extractor, etag=etag, last_modified=last_modified,
+        max_bytes=ARTICLE_MAX_BYTES, chunk_size=ARTICLE_STREAM_CHUNK, drain_bytes=ARTICLE_STREAM_DRAIN
+    )
+    if status == 304:
+        return status, None, etag, last_modified
+    if truncated:
+        logger.warning("Статья больше %d байт, текст обрезан: %s", ARTICLE_MAX_BYTES, url)
+        # Обрезанную копию нельзя подтверждать ответом 304: без валидаторов она загрузится заново, когда устареет
+        etag = last_modified = None
+    logger.debug("Статья разобрана потоком: прочитано %d байт, %s", read, url)
+    return status, extractor.finish(), etag, last_modified
+
+async def serve_stale(cache_key, url_class, scrape_key, query, lang, limit):
+    """Устаревший список из кэша, пока выключатель разомкнут; обновление — одной фоновой пробой"""
+    stale = await get_stale_data(cache_key)
+    if stale is not None:
+        scrapes.revalidate(scrape_key, retry_in(url_class), _fetch_articles_from_site, query, lang, limit)
+    return stale
+
+async def search_articles(query, lang):
+    """Поиск статей: сначала по локальному индексу, сайт — только если совпадений мало"""
+    local = await search_local(query, lang, MAX_ARTICLES)
+    if len(local) >= SEARCH_INDEX_MIN_HITS:
+        logger.debug("Найдено в локальном индексе: %d по запросу: %s", len(local), query)
+        return local
+
+    cached = await get_fresh_data(f"search_{query}_{lang}")
+    if cached is None and circuit_open("search"):
+        cached = await serve_stale(f"search_{query}_{lang}", "search", ("articles", lang, query, 10), query, lang, 10)
+    if cached is not None:
+        logger.debug("Используем кэшированные данные для запроса: %s", query)
+        site_articles = cached
+    else:
+        logger.info("Парсинг сайта для запроса: %s", query)
+        site_articles = await fetch_articles_from_site(query, lang)
+
+    # Результаты сайта уже попали в индекс; дополняем ими локальные совпадения без повторов
+    local_urls = {article["url"] for article in local}
+    return local + [article for article in site_articles if article["url"] not in local_urls]
+
+async def get_latest_articles(lang, force=False):
+    """Получение последних статей; force — мимо свежего кэша, за новыми данными с сайта"""
+    cached = None if force else await get_fresh_data(f"latest_{lang}")
+    if cached is not None:
+        logger.debug("Используем кэшированные данные для последних статей (%s)", lang)
+        return cached
+    if circuit_open("home"):
+        stale = await serve_stale(f"latest_{lang}", "home", ("articles", lang, None, 5), None, lang, 5)
+        if stale is not None:
+            return stale
+
+    logger.info("Парсинг сайта для последних статей (%s)", lang)
+    articles = await fetch_articles_from_site(lang=lang, limit=5)  # Лимит 5 для актуальных статей
     return articles
\ No newline at end of file
@@ -1,33 +1,130 @@
-import json
-import logging
-import os
-
-logger = logging.getLogger(__name__)
-
-class UserManager:
-    def __init__(self):
-        self.users = {}
-        self.load_users()
-
-    def load_users(self):
-        try:
-            if os.path.exists("users.json"):
-                with open("users.json", "r", encoding="utf-8") as f:
-                    self.users = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            logger.error(f"Ошибка загрузки пользователей: {e}")
-            self.users = {}
-
-    def save_users(self):
-        try:
-            with open("users.json", "w", encoding="utf-8") as f:
-                json.dump(self.users, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Ошибка сохранения пользователей: {e}")
-
-    def add_user(self, user_id, name, phone):
-        self.users[str(user_id)] = {"name": name, "phone": phone}
-        self.save_users()
-
-    def get_user(self, user_id):
-        return self.users.get(str(user_id))
\ No newline at end of file
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from config import USERS_DB_PATH, USERS_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+LEGACY_USERS_FILE = "users.json"
+
+class UserManager:
+    """Пользователи бота: индекс в памяти, хранение в SQLite, запись пачками в фоне"""
+
+    def __init__(self, db_path=USERS_DB_PATH):
+        self.db_path = db_path
+        self.users = {}
+        self._pending = {}
+        self._loaded = False
+        self._conn = None
+        self._lock = threading.Lock()
+        self._wakeup = None
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS users (user_id TEXT PRIMARY KEY, name TEXT NOT NULL, phone TEXT NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def load_users(self):
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._import_legacy_users(conn)
+                rows = conn.execute("SELECT user_id, name, phone FROM users").fetchall()
+            loaded = {user_id: {"name": name, "phone": phone} for user_id, name, phone in rows}
+            # Регистрации, ещё не записанные на диск, важнее прочитанного
+            loaded.update(self._pending)
+            self.users = loaded
+            self._loaded = True
+            logger.info(f"Загружено пользователей: {len(self.users)}")
+        except Exception as e:
+            logger.error(f"Ошибка загрузки пользователей: {e}")
+
+    async def load(self):
+        """Загружает пользователей при старте, не блокируя цикл событий"""
+        await asyncio.to_thread(self.load_users)
+
+    def _import_legacy_users(self, conn):
+        """Однократно переносит пользователей из старого users.json"""
+        if not os.path.exists(LEGACY_USERS_FILE):
+            return
+        try:
+            with open(LEGACY_USERS_FILE, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO users (user_id, name, phone) VALUES (?, ?, ?)",
+                    [(user_id, user["name"], user["phone"]) for user_id, user in legacy.items()]
+                )
+            os.replace(LEGACY_USERS_FILE, LEGACY_USERS_FILE + ".bak")
+            logger.info(f"Перенесено {len(legacy)} пользователей из {LEGACY_USERS_FILE}")
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.error(f"Ошибка переноса пользователей из {LEGACY_USERS_FILE}: {e}")
+
+    def save_users(self, batch):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO users (user_id, name, phone) VALUES (?, ?, ?)",
+                    [(user_id, user["name"], user["phone"]) for user_id, user in batch.items()]
+                )
+
+    async def flush(self):
+        """Записывает накопленные регистрации одной транзакцией"""
+        if not self._pending:
+            return
+        batch = dict(self._pending)
+        try:
+            await asyncio.to_thread(self.save_users, batch)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения пользователей: {e}")
+            return
+        for user_id, user in batch.items():
+            if self._pending.get(user_id) is user:
+                del self._pending[user_id]
+
+    async def run_writer(self):
+        """Фоновая задача: сбрасывает регистрации на диск пачками"""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                await self._wakeup.wait()
+                # Небольшая пауза, чтобы собрать в пачку всплеск регистраций
+                await asyncio.sleep(USERS_FLUSH_INTERVAL)
+                self._wakeup.clear()
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+    def add_user(self, user_id, name, phone):
+        user = {"name": name, "phone": phone}
+        self.users[str(user_id)] = user
+        self._pending[str(user_id)] = user
+        if self._wakeup is not None:
+            self._wakeup.set()
+        else:
+            # Фоновая запись не запущена (например, в скриптах) — пишем сразу
+            self.save_users({str(user_id): user})
+            del self._pending[str(user_id)]
+
+    def get_user(self, user_id):
+        if not self._loaded:
+            self.load_users()
+        return self.users.get(str(user_id))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Единственный экземпляр на весь бот: все обработчики видят одни и те же данные
+user_manager = UserManager()
\ No newline at end of file
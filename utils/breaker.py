@@ -0,0 +1,79 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Запрос не отправлен: выключатель для этого класса адресов разомкнут"""
+
+class CircuitBreaker:
+    """Выключатель для класса адресов сайта.
+    closed — запросы идут; после failure_threshold ошибок подряд — open, запросы сразу отклоняются;
+    через cooldown — half_open: проходит один пробный запрос, его успех замыкает выключатель."""
+
+    def __init__(self, name, failure_threshold, cooldown, max_cooldown):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def allow(self):
+        """Можно ли отправить запрос сейчас; в half_open пропускает только одну пробу"""
+        if self.state == "closed":
+            return True
+        if not self._probing and time.monotonic() >= self.opened_at + self.cooldown:
+            self.state = "half_open"
+            self._probing = True
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"Выключатель {self.name} замкнут: сайт снова отвечает")
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open":
+            # Проба не прошла: ждём вдвое дольше
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == "closed" and self.failures >= self.failure_threshold:
+            self._open()
+
+    def abandon(self):
+        """Запрос отменён или не разобран: проба не состоялась, следующий запрос может её повторить"""
+        self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self._probing = False
+        self.stats["opened"] += 1
+        logger.warning(f"Выключатель {self.name} разомкнут на {self.cooldown} с после {self.failures} ошибок подряд")
+
+    @property
+    def is_open(self):
+        """Сайт для этого класса адресов считается недоступным (open или идёт проба)"""
+        return self.state != "closed"
+
+    def retry_in(self):
+        """Через сколько секунд имеет смысл повторить запрос"""
+        if self.state == "closed":
+            return 0.0
+        if self._probing:
+            return float(self.cooldown)
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def get_stats(self):
+        return dict(self.stats, state=self.state, failures=self.failures, cooldown=self.cooldown)
\ No newline at end of file
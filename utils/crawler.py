@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import random
+from datetime import datetime
+from config import RUBRIKI, CRAWLER_INTERVAL, CRAWLER_JITTER, CRAWLER_TOP_ARTICLES, CRAWLER_REQUEST_DELAY
+from parser import fetch_articles_from_site, fetch_article_content
+from utils.helpers import fetch_topics, fetch_topic_articles, get_rubrika_query
+from utils.subscriptions import notify_new_articles, get_subscribed_feeds
+from utils.log import new_correlation_id
+
+logger = logging.getLogger(__name__)
+
+async def crawl_once():
+    """Один проход: главная, темы, все рубрики, темы с подписчиками и тексты самых свежих статей"""
+    start = datetime.now()
+    # Все записи одного прохода связаны общим идентификатором
+    new_correlation_id("crawl-")
+    logger.info("Фоновое обновление кэша: начало")
+
+    latest = await fetch_articles_from_site(lang="ru", limit=5)
+    await asyncio.sleep(CRAWLER_REQUEST_DELAY)
+
+    await fetch_topics()
+    await asyncio.sleep(CRAWLER_REQUEST_DELAY)
+
+    rubrika_articles = []
+    for name, slug in RUBRIKI.items():
+        articles = await fetch_articles_from_site(get_rubrika_query(slug), "ru")
+        rubrika_articles.extend(articles)
+        # Одна загрузка на рубрику — новые статьи уходят всем подписчикам рассылкой
+        await notify_new_articles("rubrika", slug, name, articles)
+        await asyncio.sleep(CRAWLER_REQUEST_DELAY)
+
+    # Темы обходим только те, на которые кто-то подписан
+    for topic_url, title in (await get_subscribed_feeds("topic")).items():
+        articles = await fetch_topic_articles(topic_url)
+        await notify_new_articles("topic", topic_url, title, articles)
+        await asyncio.sleep(CRAWLER_REQUEST_DELAY)
+
+    # Тексты статей: сначала с главной, затем из рубрик, без повторов
+    urls = list(dict.fromkeys(article["url"] for article in latest + rubrika_articles if article.get("url")))
+    for url in urls[:CRAWLER_TOP_ARTICLES]:
+        await fetch_article_content(url)
+        await asyncio.sleep(CRAWLER_REQUEST_DELAY)
+
+    logger.info(f"Фоновое обновление кэша завершено за {(datetime.now() - start).total_seconds():.1f} сек")
+
+async def run_crawler():
+    """Фоновая задача: обновляет кэш с интервалом CRAWLER_INTERVAL и случайным сдвигом"""
+    while True:
+        try:
+            await crawl_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка фонового обновления кэша: {e}")
+        await asyncio.sleep(CRAWLER_INTERVAL + random.uniform(-CRAWLER_JITTER, CRAWLER_JITTER))
\ No newline at end of file
@@ -0,0 +1,186 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from utils.breaker import CircuitBreaker, CircuitOpenError
+from utils.metrics import FETCH_LATENCY, FETCH_RETRIES
+from config import (
+    HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN
+)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+_session = None
+_breakers = {}  # класс адреса -> CircuitBreaker
+
+def get_session():
+    """Возвращает общую сессию aiohttp с пулом соединений (создаётся при первом обращении)"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        _session = aiohttp.ClientSession(connector=connector, headers=HEADERS)
+    return _session
+
+async def close_session():
+    """Закрывает общую сессию при остановке бота"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+def classify_url(url):
+    """Класс адреса для метрик: home, search, topic, article или other"""
+    path = urlsplit(url).path
+    if path.rstrip("/") in ("", "/uz"):
+        return "home"
+    if path.rstrip("/").endswith("/search"):
+        return "search"
+    if "/group/" in path:
+        return "topic"
+    if any(part in path for part in ("/publish/", "/article/", "/news/")):
+        return "article"
+    return "other"
+
+def get_breaker(url_class):
+    breaker = _breakers.get(url_class)
+    if breaker is None:
+        breaker = _breakers[url_class] = CircuitBreaker(url_class, BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN)
+    return breaker
+
+def circuit_open(url_class):
+    """Сайт для класса адресов сейчас считается недоступным: вместо ожидания лучше отдать кэш"""
+    return get_breaker(url_class).is_open
+
+def retry_in(url_class):
+    return get_breaker(url_class).retry_in()
+
+def get_breaker_stats():
+    return {url_class: breaker.get_stats() for url_class, breaker in _breakers.items()}
+
+def backoff_delay(attempt):
+    """Экспоненциальная пауза с полным джиттером: повторы разных запросов не приходят на сайт одновременно"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+async def _get(url, timeout, handle, headers=None):
+    """GET через общую сессию и выключатель класса адреса.
+    Обрывы соединения и 5xx повторяются с паузой; таймаут не повторяется — он уже исчерпал время ожидания.
+    Для выключателя вызов с повторами — один запрос: ошибка засчитывается одна, когда повторы исчерпаны."""
+    url_class = classify_url(url)
+    breaker = get_breaker(url_class)
+    session = get_session()
+    if not breaker.allow():
+        raise CircuitOpenError(url_class)
+    settled = False
+    attempt = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            status = "error"
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    status = response.status
+                    result = await handle(response)
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500:
+                    # Сайт ответил: 4xx — ошибка запроса, а не недоступность
+                    breaker.record_success()
+                    settled = True
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            else:
+                breaker.record_success()
+                settled = True
+                return result
+            finally:
+                FETCH_LATENCY.observe(time.perf_counter() - start, url_class=url_class, status=status)
+
+            if attempt >= HTTP_RETRIES or isinstance(error, asyncio.TimeoutError):
+                breaker.record_failure()
+                settled = True
+                raise error
+            attempt += 1
+            FETCH_RETRIES.inc(url_class=url_class)
+            await asyncio.sleep(backoff_delay(attempt))
+    finally:
+        if not settled:
+            # Отмена или ошибка в handle (разбор, декодирование): о сайте ничего не известно,
+            # но пробу нужно освободить, иначе выключатель не пропустит больше ни одного запроса
+            breaker.abandon()
+
+async def fetch_text(url, timeout, headers=None):
+    """Загружает страницу через общую сессию и возвращает её текст"""
+    async def handle(response):
+        response.raise_for_status()
+        return await response.text()
+    return await _get(url, timeout, handle, headers)
+
+def _conditional_headers(etag, last_modified):
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+async def fetch_conditional(url, timeout, etag=None, last_modified=None):
+    """Условный GET: возвращает (status, text, etag, last_modified); при 304 text равен None"""
+    headers = _conditional_headers(etag, last_modified)
+
+    async def handle(response):
+        if response.status == 304:
+            return 304, None, etag, last_modified
+        response.raise_for_status()
+        text = await response.text()
+        return response.status, text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+    return await _get(url, timeout, handle, headers)
+
+def _short_tail(response, read, drain_bytes, max_bytes):
+    """Остаток ответа не длиннее drain_bytes и не выводит прочитанное за max_bytes.
+    Content-Length считает байты на проводе, а read — уже распакованные, поэтому сжатый ответ не дочитывается"""
+    length = response.content_length
+    if length is None or response.headers.get("Content-Encoding", "identity").lower() != "identity":
+        return False
+    return length - read <= drain_bytes and not (max_bytes and length > max_bytes)
+
+async def fetch_streaming(url, timeout, sink, etag=None, last_modified=None, max_bytes=None, chunk_size=16384, drain_bytes=0):
+    """Условный GET с разбором тела по мере чтения: куски ответа передаются в sink.feed(),
+    чтение прекращается, когда feed вернёт True или прочитано max_bytes.
+    Хвост несжатого ответа не длиннее drain_bytes (по Content-Length) дочитывается без разбора,
+    чтобы соединение вернулось в пул; max_bytes ограничивает и его.
+    Перед первым куском вызывается sink.begin(кодировка) — и заново при повторе запроса.
+    Возвращает (status, etag, last_modified, прочитано байт, обрезано по max_bytes)."""
+    headers = _conditional_headers(etag, last_modified)
+
+    async def handle(response):
+        if response.status == 304:
+            return 304, etag, last_modified, 0, False
+        response.raise_for_status()
+        sink.begin(response.charset)
+        read = 0
+        truncated = False
+        async for chunk in response.content.iter_chunked(chunk_size):
+            read += len(chunk)
+            if sink.feed(chunk):
+                if _short_tail(response, read, drain_bytes, max_bytes):
+                    # Короткий хвост дешевле дочитать, чем открывать новое соединение
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        read += len(chunk)
+                break
+            if max_bytes and read >= max_bytes:
+                truncated = True
+                break
+        # Недочитанный ответ закрывает соединение при выходе из session.get — остаток не скачивается
+        return response.status, response.headers.get("ETag"), response.headers.get("Last-Modified"), read, truncated
+    return await _get(url, timeout, handle, headers)
\ No newline at end of file
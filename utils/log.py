@@ -0,0 +1,98 @@
+import json
+import logging
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Идентификатор текущего запроса: обновления Telegram или прохода краулера
+correlation_id = ContextVar("correlation_id", default="-")
+
+# Стандартные атрибуты LogRecord; всё остальное пришло через extra= и попадает в JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "correlation_id"}
+
+_listener = None
+
+def new_correlation_id(prefix=""):
+    """Назначает новый идентификатор текущему контексту и возвращает его"""
+    value = prefix + uuid.uuid4().hex[:12]
+    correlation_id.set(value)
+    return value
+
+class CorrelationIdFilter(logging.Filter):
+    """Проставляет в запись идентификатор запроса из контекста вызывающего кода"""
+
+    def filter(self, record):
+        record.correlation_id = correlation_id.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только каждую N-ю DEBUG-запись с одного места вызова"""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key = (record.pathname, record.lineno)
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        if count % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись: время, уровень, логгер, сообщение, correlation_id и поля из extra"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def setup_logging(level="INFO", json_format=True, debug_sample_every=1):
+    """Логи идут через очередь: цикл событий только кладёт запись, вывод делает отдельный поток"""
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(sys.stderr)
+    if json_format:
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    handler = QueueHandler(log_queue)
+    # Фильтры работают в вызывающем потоке: там доступен контекст и отбрасываются лишние записи
+    handler.addFilter(SamplingFilter(debug_sample_every))
+    handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Дописывает оставшиеся записи и останавливает поток вывода"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
\ No newline at end of file
@@ -0,0 +1,108 @@
+import time
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [счётчики по корзинам, сумма, количество]
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def time(self, **labels):
+        """Контекстный менеджер: замеряет длительность блока"""
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (bucket_counts, total, count) in sorted(self._series.items()):
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', bound)])} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+HANDLER_LATENCY = Histogram("bot_handler_duration_seconds", "Время обработки обновления по обработчикам", ["handler"])
+FETCH_LATENCY = Histogram("kadrovik_fetch_duration_seconds", "Время загрузки страниц kadrovik.uz", ["url_class", "status"])
+PARSE_LATENCY = Histogram("kadrovik_parse_duration_seconds", "Время разбора HTML", ["function"])
+FETCH_RETRIES = Counter("kadrovik_fetch_retries_total", "Повторы загрузки страниц после обрыва или 5xx", ["url_class"])
+SCRAPE_REQUESTS = Counter("kadrovik_scrapes_total", "Загрузки через объединитель: executed, coalesced, revalidation", ["family", "result"])
+CACHE_REQUESTS = Counter("bot_cache_requests_total", "Обращения к кэшу: hit, miss, stale, revalidated", ["family", "result"])
+TELEGRAM_LATENCY = Histogram("telegram_api_duration_seconds", "Время вызовов Telegram Bot API", ["method", "status"])
+OUTBOUND_WAIT = Histogram("telegram_outbound_wait_seconds", "Ожидание в очереди исходящих перед вызовом Telegram API", ["priority"])
+OUTBOUND_RETRIES = Counter("telegram_outbound_retries_total", "Повторы исходящих после 429 Too Many Requests", ["method"])
+
+REGISTRY = [HANDLER_LATENCY, FETCH_LATENCY, FETCH_RETRIES, PARSE_LATENCY, SCRAPE_REQUESTS, CACHE_REQUESTS, TELEGRAM_LATENCY, OUTBOUND_WAIT, OUTBOUND_RETRIES]
+
+def cache_family(key):
+    """Семейство ключа кэша: latest_ru → latest, search_отпуск_ru → search"""
+    return key.split("_", 1)[0]
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+async def handle_metrics(request):
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8")
+
+async def start_metrics_server(host, port):
+    """Отдельный HTTP-сервер с /metrics в текстовом формате Prometheus"""
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
\ No newline at end of file
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from aiogram.exceptions import TelegramRetryAfter
+from config import (
+    OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST, OUTBOUND_GROUP_RATE,
+    OUTBOUND_MAX_RETRIES, OUTBOUND_MAX_CHATS
+)
+from utils.metrics import OUTBOUND_WAIT, OUTBOUND_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Ответы пользователю идут раньше фоновых рассылок
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_LOW: "low"}
+
+send_priority = ContextVar("send_priority", default=PRIORITY_HIGH)
+
+@contextmanager
+def priority(level):
+    """Все вызовы Telegram API внутри блока отправляются с указанным приоритетом"""
+    token = send_priority.set(level)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity в запасе"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0  # после 429 Telegram сам говорит, сколько ждать
+
+    def delay(self):
+        """Сколько секунд ждать до свободного токена; 0 — можно отправлять"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self.take()
+
+class OutboundDispatcher:
+    """Единая точка исходящих вызовов: лимиты на чат и на бота, приоритеты и повторы после 429"""
+
+    def __init__(self, global_rate, chat_rate, chat_burst, group_rate, max_retries, max_chats):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self._chat_buckets = OrderedDict()
+        self._waiters = []  # (приоритет, порядковый номер, future) — очередь за глобальным токеном
+        self._seq = itertools.count()
+        self._pump_task = None
+        self.stats = {"sent": 0, "retried": 0, "failed": 0}
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Отрицательные id — группы и каналы, у них лимит строже
+            is_group = isinstance(chat_id, int) and chat_id < 0
+            bucket = TokenBucket(self.group_rate, 1) if is_group else TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+            if len(self._chat_buckets) > self.max_chats:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def _acquire_global(self, level):
+        """Ждёт глобальный токен; токены выдаются по приоритету, внутри приоритета — по очереди"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._seq), future))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self):
+        while self._waiters:
+            wait = self.global_bucket.delay()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # ожидающий отменён
+            self.global_bucket.take()
+            future.set_result(None)
+
+    async def send(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        level = send_priority.get()
+        method_name = type(method).__name__
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            bucket = None
+            if chat_id is not None:
+                # Сообщения в чат: лимит чата, затем общий лимит бота
+                bucket = self._chat_bucket(chat_id)
+                await bucket.acquire()
+                await self._acquire_global(level)
+            OUTBOUND_WAIT.observe(time.perf_counter() - start, priority=PRIORITY_NAMES.get(level, level))
+            try:
+                response = await make_request(bot, method)
+                self.stats["sent"] += 1
+                return response
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["retried"] += 1
+                OUTBOUND_RETRIES.inc(method=method_name)
+                logger.warning(f"429 для {method_name} в чат {chat_id}, повтор через {e.retry_after} сек")
+                if bucket is not None:
+                    # Остальные сообщения в этот чат тоже ждут
+                    bucket.block(e.retry_after)
+                else:
+                    await asyncio.sleep(e.retry_after)
+
+outbound = OutboundDispatcher(
+    OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST, OUTBOUND_GROUP_RATE,
+    OUTBOUND_MAX_RETRIES, OUTBOUND_MAX_CHATS
+)
\ No newline at end of file
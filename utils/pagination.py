@@ -0,0 +1,106 @@
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from config import LIST_PAGE_SIZE, LIST_PAGE_CACHE_FRESH, KADROVIK_BASE_URL
+from kadrovik_parser import extract_list_page
+from utils.http_client import fetch_text, classify_url, circuit_open, retry_in
+from utils.parsing import run_parser
+from utils.registry import register_items
+from utils.search_index import index_articles
+from utils.singleflight import scrapes
+from utils.storage import get_cache_entry, get_fresh_data, get_stale_data, set_cache_entry
+
+logger = logging.getLogger(__name__)
+
+# Экран списка -> чьи страницы он листает: рубрики собираются поиском по сайту
+LIST_SOURCES = {"search": "search", "rubrika": "search", "topic": "topic"}
+
+def search_url(query, lang="ru"):
+    """Адрес поиска на сайте; запрос экранируется целиком — «#», «&» и «?» в нём не ломают адрес"""
+    base_url = KADROVIK_BASE_URL if lang == "ru" else f"{KADROVIK_BASE_URL}uz/"
+    return f"{base_url}search?q={quote(query, safe='')}"
+
+def page_cache_key(url):
+    return f"page_{url}"
+
+async def page_is_fresh(url):
+    """Страница списка уже в кэше и не устарела (без учёта в метриках кэша — для упреждения)"""
+    entry = await get_cache_entry(page_cache_key(url))
+    return bool(entry) and datetime.now() - datetime.fromisoformat(entry["timestamp"]) < timedelta(seconds=LIST_PAGE_CACHE_FRESH)
+
+async def get_list_page(source, url):
+    """Страница списка сайта {"articles", "next_url"}: из кэша, пока он свежий, иначе с сайта.
+    Каждая страница кэшируется отдельно, поэтому старые страницы загружаются, только когда их листают."""
+    cached = await get_fresh_data(page_cache_key(url), timedelta(seconds=LIST_PAGE_CACHE_FRESH))
+    if cached is not None:
+        return cached
+    url_class = classify_url(url)
+    if circuit_open(url_class):
+        stale = await get_stale_data(page_cache_key(url))
+        if stale is not None:
+            scrapes.revalidate(("page", url), retry_in(url_class), _fetch_list_page, source, url)
+            return stale
+    return await fetch_list_page(source, url)
+
+async def fetch_list_page(source, url):
+    """Загрузка страницы списка с сайта (одновременные запросы одной страницы объединяются)"""
+    return await scrapes.do(("page", url), _fetch_list_page, source, url)
+
+async def _fetch_list_page(source, url):
+    try:
+        text = await fetch_text(url, timeout=6)
+        page = await run_parser(extract_list_page, text, source, url, KADROVIK_BASE_URL)
+        await set_cache_entry(page_cache_key(url), page)
+        await index_articles(page["articles"])
+        logger.info("Страница списка: %d статей, следующая: %s", len(page["articles"]), page["next_url"], extra={"url": url})
+        return page
+    except Exception as e:
+        logger.error("Ошибка загрузки страницы списка: %s", e, extra={"url": url})
+        entry = await get_cache_entry(page_cache_key(url))
+        return entry["data"] if entry else {"articles": [], "next_url": None}
+
+def new_cursor(screen, title, page_url, offset=0, number=1):
+    """Курсор экрана списка: страница сайта и сдвиг в ней. url — ключ курсора в реестре"""
+    return {
+        "url": f"{page_url}#{screen}-{offset}",
+        "screen": screen,
+        "title": title,
+        "page_url": page_url,
+        "offset": offset,
+        "number": number
+    }
+
+def _advance(cursor, page, end):
+    """Курсор экрана после того, как показаны статьи страницы до позиции end; None — список закончился"""
+    if end < len(page["articles"]):
+        return new_cursor(cursor["screen"], cursor["title"], cursor["page_url"], end, cursor["number"] + 1)
+    if page["next_url"]:
+        return new_cursor(cursor["screen"], cursor["title"], page["next_url"], 0, cursor["number"] + 1)
+    return None
+
+async def cursor_id(cursor):
+    """Идентификатор курсора для кнопки «Далее»: курсоры лежат в общем реестре, как статьи и темы"""
+    return (await register_items("cursor", [cursor]))[0]
+
+async def load_page(cursor):
+    """Статьи экрана курсора и курсор следующего экрана (None — дальше ничего нет)"""
+    page = await get_list_page(LIST_SOURCES[cursor["screen"]], cursor["page_url"])
+    end = cursor["offset"] + LIST_PAGE_SIZE
+    return page["articles"][cursor["offset"]:end], _advance(cursor, page, end)
+
+async def search_next_cursor(screen, title, query, lang, shown):
+    """Продолжение первого экрана поиска (локальный индекс и первая страница сайта) страницами поиска на сайте —
+    с того места первой страницы, до которого дошёл первый экран; lang — язык, на котором искали"""
+    url = search_url(query, lang)
+    cursor = new_cursor(screen, title, url)
+    page = await get_stale_data(page_cache_key(url))
+    if page is None:
+        # Хватило локального индекса: первая страница сайта загрузится по кнопке «Далее» или упреждением
+        return dict(cursor, number=2)
+    positions = {article["url"]: i for i, article in enumerate(page["articles"])}
+    end = max((positions[article["url"]] + 1 for article in shown if article["url"] in positions), default=0)
+    return _advance(cursor, page, end)
+
+def prefetch_target(cursor):
+    """Что загрузить заранее, пока пользователь читает текущий экран: (источник, адрес страницы) следующего"""
+    return (LIST_SOURCES[cursor["screen"]], cursor["page_url"]) if cursor else None
\ No newline at end of file
@@ -0,0 +1,46 @@
+import asyncio
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from config import PARSER_EXECUTOR, PARSER_WORKERS
+from utils.metrics import PARSE_LATENCY
+
+_executor = None
+
+def get_executor():
+    """Пул для разбора HTML: потоки или процессы в зависимости от PARSER_EXECUTOR"""
+    global _executor
+    if _executor is None:
+        if PARSER_EXECUTOR == "process":
+            # spawn: дочерние процессы не наследуют потоки и блокировки цикла событий
+            _executor = ProcessPoolExecutor(max_workers=PARSER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            _executor = ThreadPoolExecutor(max_workers=PARSER_WORKERS, thread_name_prefix="parser")
+    return _executor
+
+async def run_parser(func, *args):
+    """Выполняет функцию извлечения в пуле, не блокируя цикл событий.
+    Для пула процессов func должна быть функцией верхнего уровня модуля."""
+    loop = asyncio.get_running_loop()
+    with PARSE_LATENCY.time(function=func.__name__):
+        if isinstance(get_executor(), ThreadPoolExecutor):
+            # В потоке сохраняем контекст вызывающего, чтобы логи разбора несли его correlation_id
+            return await loop.run_in_executor(get_executor(), contextvars.copy_context().run, func, *args)
+        return await loop.run_in_executor(get_executor(), func, *args)
+
+def _warm_up():
+    import bs4
+    import lxml.etree
+    from kadrovik_parser import engine
+    engine.compile_all()
+
+async def warm_up_parser():
+    """Импорт bs4 и lxml и компиляция селекторов в пуле после старта: первый разбор не ждёт ни того, ни другого"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(get_executor(), _warm_up)
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
\ No newline at end of file
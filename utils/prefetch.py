@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from config import PREFETCH_ENABLED, PREFETCH_TOP_N, PREFETCH_CONCURRENCY, PREFETCH_RATE, PREFETCH_BURST, ARTICLE_CACHE_FRESH
+from parser import fetch_article_content
+from utils.http_client import classify_url, circuit_open
+from utils.outbound import TokenBucket
+from utils.pagination import fetch_list_page, page_is_fresh
+from utils.singleflight import scrapes
+from utils.storage import get_cached_article
+
+logger = logging.getLogger(__name__)
+
+class Prefetcher:
+    """Упреждающая загрузка текстов первых статей показанного списка и его следующей страницы:
+    нажатие на статью или «Далее» попадает в тёплый кэш.
+    Не больше concurrency загрузок одновременно и не больше rate в секунду на весь бот;
+    новый список пользователя отменяет недогруженное упреждение по предыдущему."""
+
+    def __init__(self, top_n, concurrency, rate, burst, enabled=True):
+        self.top_n = top_n
+        self.enabled = enabled
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._budget = TokenBucket(rate, burst)
+        self._tasks = {}  # user_id -> задача упреждения по последнему списку
+        self._inflight = set()
+        self.stats = {"fetched": 0, "failed": 0, "cached": 0, "inflight": 0, "over_budget": 0, "cancelled": 0, "pages": 0}
+
+    def schedule(self, user_id, articles, next_page=None):
+        """Запускает упреждение для только что показанного списка; не ждёт загрузки.
+        next_page — (источник, адрес) следующей страницы списка, если она есть"""
+        if not self.enabled:
+            return
+        self.cancel(user_id)
+        urls = [
+            article["url"] for article in articles[:self.top_n]
+            if not article.get("text") and classify_url(article.get("url", "")) == "article"
+        ]
+        if not urls and not next_page:
+            return
+        task = asyncio.create_task(self._run(urls, next_page))
+        self._tasks[user_id] = task
+
+        def _forget(done):
+            if self._tasks.get(user_id) is done:
+                del self._tasks[user_id]
+
+        task.add_done_callback(_forget)
+
+    def cancel(self, user_id):
+        task = self._tasks.pop(user_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            self.stats["cancelled"] += 1
+
+    async def cancel_all(self):
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, urls, next_page):
+        # Семафор пропускает по порядку: первые пункты списка открывают чаще
+        await asyncio.gather(*(self._prefetch(url) for url in urls))
+        # Следующая страница списка нужна реже, чем статьи текущей, — после них
+        if next_page:
+            await self._prefetch_page(*next_page)
+
+    async def _prefetch_page(self, source, url):
+        if scrapes.in_flight(("page", url)):
+            self.stats["inflight"] += 1
+            return
+        async with self._semaphore:
+            if circuit_open(classify_url(url)):
+                return
+            if await page_is_fresh(url):
+                self.stats["cached"] += 1
+                return
+            if self._budget.delay() > 0:
+                self.stats["over_budget"] += 1
+                return
+            self._budget.take()
+            page = await fetch_list_page(source, url)
+        if page["articles"]:
+            self.stats["pages"] += 1
+            logger.debug("Следующая страница списка загружена заранее: %s", url)
+        else:
+            self.stats["failed"] += 1
+
+    async def _prefetch(self, url):
+        if url in self._inflight or scrapes.in_flight(("article", url)):
+            self.stats["inflight"] += 1
+            return
+        async with self._semaphore:
+            # Пока сайт недоступен, упреждение только добавило бы отклонённых запросов
+            if circuit_open("article"):
+                return
+            cached = await get_cached_article(url)
+            if cached and time.time() - cached["fetched_at"] < ARTICLE_CACHE_FRESH:
+                self.stats["cached"] += 1
+                return
+            if self._budget.delay() > 0:
+                self.stats["over_budget"] += 1
+                return
+            self._budget.take()
+            self._inflight.add(url)
+            try:
+                # Отмена упреждения не прерывает саму загрузку: её мог уже ждать и пользователь (scrapes)
+                content = await fetch_article_content(url)
+            finally:
+                self._inflight.discard(url)
+        if content:
+            self.stats["fetched"] += 1
+            logger.debug("Статья загружена заранее: %s", url)
+        else:
+            self.stats["failed"] += 1
+
+    def get_stats(self):
+        return dict(self.stats, users=len(self._tasks))
+
+prefetcher = Prefetcher(PREFETCH_TOP_N, PREFETCH_CONCURRENCY, PREFETCH_RATE, PREFETCH_BURST, PREFETCH_ENABLED)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import REGISTRY_DB_PATH, REGISTRY_MEMORY_ITEMS
+
+logger = logging.getLogger(__name__)
+
+_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+def item_id(url):
+    """Короткий стабильный идентификатор URL (до 13 символов [0-9a-z]): одинаков во всех процессах и после перезапуска"""
+    value = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+    digits = []
+    while True:
+        value, rest = divmod(value, 36)
+        digits.append(_ALPHABET[rest])
+        if not value:
+            return "".join(reversed(digits))
+
+class ItemRegistry:
+    """Общий реестр статей и тем по стабильным идентификаторам.
+    Кнопки несут идентификатор, поэтому нажатие может обработать любой процесс бота, в том числе перезапущенный."""
+
+    def __init__(self, db_path=REGISTRY_DB_PATH, memory_items=REGISTRY_MEMORY_ITEMS):
+        self.db_path = db_path
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()  # память; база — под отдельной блокировкой, чтобы запись не задерживала цикл событий
+        self._db_lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS items (id TEXT PRIMARY KEY, kind TEXT NOT NULL, data TEXT NOT NULL, updated REAL NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key, item):
+        self._memory[key] = item
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def changed_items(self, items):
+        """Идентификаторы и элементы, которых ещё нет в памяти в таком же виде (их нужно записать в базу)"""
+        ids = [item_id(item["url"]) for item in items]
+        with self._lock:
+            changed = [(key, item) for key, item in zip(ids, items) if self._memory.get(key) != item]
+        return ids, changed
+
+    def store(self, kind, changed):
+        now = time.time()
+        with self._db_lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO items (id, kind, data, updated) VALUES (?, ?, ?, ?)",
+                [(key, kind, json.dumps(item, ensure_ascii=False), now) for key, item in changed]
+            )
+        with self._lock:
+            for key, item in changed:
+                self._remember(key, item)
+
+    def cached(self, key):
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                self._memory.move_to_end(key)
+            return item
+
+    def load(self, key):
+        with self._db_lock:
+            row = self._connect().execute("SELECT data FROM items WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        item = json.loads(row[0])
+        with self._lock:
+            self._remember(key, item)
+        return item
+
+    def snapshot(self):
+        with self._lock:
+            return [[key, item] for key, item in self._memory.items()]
+
+    def restore(self, items):
+        with self._lock:
+            for key, item in items:
+                self._remember(key, item)
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+registry = ItemRegistry()
+
+async def register_items(kind, items):
+    """Идентификаторы для кнопок; в базу пишутся только новые или изменившиеся элементы"""
+    ids, changed = registry.changed_items(items)
+    if changed:
+        try:
+            await asyncio.to_thread(registry.store, kind, changed)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения в реестр: {e}")
+    return ids
+
+async def get_item(key):
+    """Элемент по идентификатору из кнопки; None, если он неизвестен"""
+    item = registry.cached(key)
+    if item is not None:
+        return item
+    try:
+        return await asyncio.to_thread(registry.load, key)
+    except Exception as e:
+        logger.error(f"Ошибка чтения реестра: {e}")
+        return None
+
+def callback_item_id(data):
+    """Идентификатор из callback_data вида <префикс>_<id>"""
+    return data.rsplit("_", 1)[1]
\ No newline at end of file
@@ -0,0 +1,42 @@
+import hashlib
+import json
+from collections import OrderedDict
+from config import RENDER_CACHE_MAX_ENTRIES
+from utils.metrics import CACHE_REQUESTS
+
+def data_version(items):
+    """Версия данных экрана: меняется, только когда меняется содержимое списка"""
+    payload = json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+class RenderCache:
+    """Готовые тексты и клавиатуры экранов-списков.
+    Экран строится один раз на версию данных; повторные нажатия отдают готовую разметку."""
+
+    def __init__(self, max_entries=RENDER_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # экран -> (версия данных, (текст, клавиатура)); новая версия вытесняет старую сразу
+        self._screens = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    async def get_or_render(self, screen, version, render):
+        """render — корутина без аргументов, возвращающая (текст, клавиатура)"""
+        cached = self._screens.get(screen)
+        if cached is not None and cached[0] == version:
+            self._screens.move_to_end(screen)
+            self.stats["hits"] += 1
+            CACHE_REQUESTS.inc(family="render", result="hit")
+            return cached[1]
+        self.stats["misses"] += 1
+        CACHE_REQUESTS.inc(family="render", result="miss")
+        rendered = await render()
+        self._screens[screen] = (version, rendered)
+        self._screens.move_to_end(screen)
+        while len(self._screens) > self.max_entries:
+            self._screens.popitem(last=False)
+        return rendered
+
+    def __len__(self):
+        return len(self._screens)
+
+render_cache = RenderCache()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+from config import SEARCH_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+def _article_lang(url):
+    return "uz" if "/uz/" in url else "ru"
+
+def _match_expression(query):
+    """Запрос FTS5: все слова обязательны, каждое ищется по префиксу.
+    Длинные слова укорачиваются на окончание, чтобы «отпуска» находило «отпуск» и «отпусков»."""
+    terms = []
+    for word in re.findall(r"\w+", query.lower()):
+        if len(word) > 5:
+            word = word[:-2]
+        terms.append(f'"{word}"*')
+    return " ".join(terms)
+
+class SearchIndex:
+    """Локальный полнотекстовый индекс (SQLite FTS5) по уже загруженным статьям"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                "id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, lang TEXT NOT NULL, "
+                "title TEXT NOT NULL, date TEXT NOT NULL, summary TEXT NOT NULL, body TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5("
+                "title, date, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _upsert(self, conn, url, title=None, date=None, summary=None, body=None):
+        row = conn.execute("SELECT id, title, date, summary, body FROM docs WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            cursor = conn.execute(
+                "INSERT INTO docs (url, lang, title, date, summary, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, _article_lang(url), title or "", date or "", summary or "", body or "")
+            )
+            doc_id = cursor.lastrowid
+        else:
+            doc_id = row[0]
+            # Новые непустые поля заменяют старые, остальное сохраняется
+            title = title or row[1]
+            date = date or row[2]
+            summary = summary or row[3]
+            body = body or row[4]
+            conn.execute(
+                "UPDATE docs SET title = ?, date = ?, summary = ?, body = ? WHERE id = ?",
+                (title, date, summary, body, doc_id)
+            )
+            conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+        conn.execute(
+            "INSERT INTO docs_fts (rowid, title, date, body) VALUES (?, ?, ?, ?)",
+            (doc_id, title or "", date or "", " ".join(part for part in (summary, body) if part))
+        )
+
+    def add_articles(self, articles):
+        """Добавляет в индекс элементы списков статей (заголовок, дата, краткое описание)"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for article in articles:
+                    if article.get("url"):
+                        self._upsert(conn, article["url"], article.get("title"), article.get("date"), article.get("content"))
+
+    def add_body(self, url, title, date, body):
+        """Добавляет в индекс полный текст статьи"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._upsert(conn, url, title, date, body=body)
+
+    def search(self, query, lang="ru", limit=10):
+        expression = _match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT d.url, d.title, d.date, d.summary, d.body FROM docs_fts "
+                "JOIN docs d ON d.id = docs_fts.rowid "
+                "WHERE docs_fts MATCH ? AND d.lang = ? "
+                "ORDER BY bm25(docs_fts, 10.0, 1.0, 1.0) LIMIT ?",
+                (expression, lang, limit)
+            ).fetchall()
+        return [
+            {
+                "title": title or "Без заголовка",
+                "content": summary or (body[:200] + "..." if len(body) > 200 else body),
+                "date": date,
+                "emoji": "📰",
+                "url": url
+            }
+            for url, title, date, summary, body in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+search_index = SearchIndex(SEARCH_INDEX_PATH)
+
+async def index_articles(articles):
+    try:
+        await asyncio.to_thread(search_index.add_articles, articles)
+    except Exception as e:
+        logger.error(f"Ошибка индексации статей: {e}")
+
+async def index_article_body(url, title, date, body):
+    try:
+        await asyncio.to_thread(search_index.add_body, url, title, date, body)
+    except Exception as e:
+        logger.error(f"Ошибка индексации текста статьи: {e}")
+
+async def search_local(query, lang="ru", limit=10):
+    """Поиск по локальному индексу; при ошибке возвращает пустой список"""
+    try:
+        return await asyncio.to_thread(search_index.search, query, lang, limit)
+    except Exception as e:
+        logger.error(f"Ошибка поиска по локальному индексу: {e}")
+        return []
\ No newline at end of file
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class MemorySessionBackend:
+    """Сессии живут только в памяти процесса: вытесненная сессия теряется"""
+
+    async def load(self, user_id):
+        return None
+
+    async def save(self, user_id, data, last_seen):
+        pass
+
+    async def purge_idle(self, cutoff):
+        pass
+
+    def close(self):
+        pass
+
+class SQLiteSessionBackend:
+    """Сессии сохраняются в SQLite: вытесненная из памяти сессия подгружается при следующем обращении"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "user_id INTEGER PRIMARY KEY, data TEXT NOT NULL, last_seen REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _load(self, user_id):
+        with self._lock:
+            row = self._connect().execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, user_id, payload, last_seen):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (user_id, data, last_seen) VALUES (?, ?, ?)",
+                    (user_id, payload, last_seen)
+                )
+
+    def _purge_idle(self, cutoff):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM sessions WHERE last_seen < ?", (cutoff,))
+
+    async def load(self, user_id):
+        return await asyncio.to_thread(self._load, user_id)
+
+    async def save(self, user_id, data, last_seen):
+        await asyncio.to_thread(self._save, user_id, json.dumps(data, ensure_ascii=False), last_seen)
+
+    async def purge_idle(self, cutoff):
+        await asyncio.to_thread(self._purge_idle, cutoff)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def create_session_backend(kind, path):
+    if kind == "sqlite":
+        return SQLiteSessionBackend(path)
+    return MemorySessionBackend()
+
+class SessionStore:
+    """Сессии пользователей с пространствами имён (news_items, search_results, ...).
+    В памяти держится ограниченное число сессий: простаивающие дольше idle_ttl и
+    давно не использованные сверх лимита по количеству и объёму вытесняются."""
+
+    def __init__(self, backend, idle_ttl, max_users, max_bytes):
+        self.backend = backend
+        self.idle_ttl = idle_ttl
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()  # user_id -> {"data", "size", "last_seen"}
+        self._total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "loaded": 0, "evicted_idle": 0, "evicted_memory": 0}
+
+    async def _session(self, user_id):
+        session = self._sessions.get(user_id)
+        if session is not None:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            data = None
+            try:
+                data = await self.backend.load(user_id)
+            except Exception as e:
+                logger.error(f"Ошибка загрузки сессии {user_id}: {e}")
+            if data is not None:
+                self.stats["loaded"] += 1
+            session = {"data": data or {}, "size": 0, "last_seen": 0}
+            self._sessions[user_id] = session
+            self._resize(session)
+        session["last_seen"] = time.time()
+        self._sessions.move_to_end(user_id)
+        self._enforce_limits()
+        return session
+
+    def _resize(self, session):
+        size = len(json.dumps(session["data"], ensure_ascii=False).encode("utf-8"))
+        self._total_bytes += size - session["size"]
+        session["size"] = size
+
+    def _drop(self, user_id):
+        session = self._sessions.pop(user_id)
+        self._total_bytes -= session["size"]
+
+    async def get(self, user_id, namespace, default=None):
+        session = await self._session(user_id)
+        return session["data"].get(namespace, default)
+
+    async def set(self, user_id, namespace, value):
+        """Обновляет одно пространство имён, не затрагивая остальные данные пользователя"""
+        session = await self._session(user_id)
+        session["data"][namespace] = value
+        self._resize(session)
+        try:
+            await self.backend.save(user_id, session["data"], session["last_seen"])
+        except Exception as e:
+            logger.error(f"Ошибка сохранения сессии {user_id}: {e}")
+        self._enforce_limits()
+
+    def _enforce_limits(self):
+        # Самая свежая сессия (текущий пользователь) не вытесняется
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_users or self._total_bytes > self.max_bytes):
+            user_id = next(iter(self._sessions))
+            self._drop(user_id)
+            self.stats["evicted_memory"] += 1
+
+    async def evict_idle(self):
+        cutoff = time.time() - self.idle_ttl
+        for user_id in [uid for uid, session in self._sessions.items() if session["last_seen"] < cutoff]:
+            self._drop(user_id)
+            self.stats["evicted_idle"] += 1
+        await self.backend.purge_idle(cutoff)
+
+    async def run_janitor(self, interval):
+        """Фоновая задача: периодически вытесняет простаивающие сессии"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f"Ошибка очистки сессий: {e}")
+
+    def snapshot(self):
+        """Сессии в памяти от давних к свежим — для тёплого старта"""
+        return [[user_id, session["data"], session["last_seen"]] for user_id, session in self._sessions.items()]
+
+    def restore(self, items):
+        cutoff = time.time() - self.idle_ttl
+        for user_id, data, last_seen in items:
+            if last_seen < cutoff or user_id in self._sessions:
+                continue
+            session = {"data": data, "size": 0, "last_seen": last_seen}
+            self._sessions[user_id] = session
+            self._resize(session)
+        self._enforce_limits()
+
+    def get_metrics(self):
+        return dict(self.stats, users=len(self._sessions), bytes=self._total_bytes)
+
+    def close(self):
+        self.backend.close()
\ No newline at end of file
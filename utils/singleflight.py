@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from utils.metrics import SCRAPE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Объединяет одновременные одинаковые запросы: все вызывающие ждут одну загрузку и получают общий результат"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {"executed": 0, "coalesced": 0, "revalidations": 0}
+
+    async def do(self, key, func, *args, **kwargs):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            SCRAPE_REQUESTS.inc(family=key[0], result="coalesced")
+            logger.debug("Запрос %s объединён с уже выполняющимся (всего объединено: %d)", key, self.stats["coalesced"])
+            # shield: отмена одного ожидающего не должна отменять общую загрузку
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func(*args, **kwargs))
+        self._inflight[key] = future
+        self.stats["executed"] += 1
+        SCRAPE_REQUESTS.inc(family=key[0], result="executed")
+
+        def _forget(done):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled():
+                # Ошибку получают ожидающие; если всех их отменили, asyncio иначе пишет «Task exception was never retrieved»
+                done.exception()
+
+        future.add_done_callback(_forget)
+        return await asyncio.shield(future)
+
+    def revalidate(self, key, delay, func, *args):
+        """Фоновое обновление через delay секунд; не запускается, если обновление с этим ключом уже ждёт или идёт.
+        Вызывающий не ждёт результата — он уже отдал пользователю устаревшие данные."""
+        family = key[0]
+        key = ("revalidate",) + key
+        if key in self._inflight:
+            return
+
+        async def _run():
+            await asyncio.sleep(delay)
+            return await func(*args)
+
+        future = asyncio.ensure_future(_run())
+        self._inflight[key] = future
+        self.stats["revalidations"] += 1
+        SCRAPE_REQUESTS.inc(family=family, result="revalidation")
+
+        def _forget(done):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled() and done.exception() is not None:
+                logger.error(f"Ошибка фонового обновления {key}: {done.exception()}")
+
+        future.add_done_callback(_forget)
+
+    def in_flight(self, key):
+        return key in self._inflight
+
+    def get_stats(self):
+        return dict(self.stats, inflight=len(self._inflight))
+
+# Общий объединитель для всех загрузок с kadrovik.uz
+scrapes = SingleFlight()
\ No newline at end of file
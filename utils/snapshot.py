@@ -0,0 +1,67 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from config import WARM_START_PATH, WARM_START_MAX_AGE
+from context import app
+from utils.storage import memory_cache
+from utils.registry import registry
+
+logger = logging.getLogger(__name__)
+
+def _collect():
+    return {
+        "saved_at": time.time(),
+        "memory_cache": memory_cache.snapshot(),
+        "sessions": app.user_sessions.snapshot(),
+        "registry": registry.snapshot()
+    }
+
+def _write(path, snapshot):
+    # Запись во временный файл и замена: при сбое остаётся прежний снимок, а не половина нового
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _read(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+async def save_snapshot(path=WARM_START_PATH):
+    """Сохраняет горячие данные из памяти при остановке, чтобы следующий запуск не начинал с холодного кэша"""
+    try:
+        snapshot = _collect()
+        await asyncio.to_thread(_write, path, snapshot)
+        logger.info(
+            f"Снимок для тёплого старта сохранён: кэш {len(snapshot['memory_cache'])}, "
+            f"сессии {len(snapshot['sessions'])}, реестр {len(snapshot['registry'])}"
+        )
+    except Exception as e:
+        logger.error(f"Ошибка сохранения снимка {path}: {e}")
+
+async def load_snapshot(path=WARM_START_PATH, max_age=WARM_START_MAX_AGE):
+    """Восстанавливает снимок при старте; устаревший или повреждённый снимок пропускается"""
+    try:
+        snapshot = await asyncio.to_thread(_read, path)
+    except Exception as e:
+        logger.error(f"Ошибка чтения снимка {path}: {e}")
+        return False
+    if snapshot is None:
+        return False
+    age = time.time() - snapshot.get("saved_at", 0)
+    if age > max_age:
+        logger.info(f"Снимок {path} устарел ({age:.0f} с), запуск с холодным кэшем")
+        return False
+    try:
+        memory_cache.restore(snapshot.get("memory_cache", []))
+        app.user_sessions.restore(snapshot.get("sessions", []))
+        registry.restore(snapshot.get("registry", []))
+    except Exception as e:
+        logger.error(f"Ошибка восстановления снимка {path}: {e}")
+        return False
+    logger.info(f"Тёплый старт из снимка возрастом {age:.0f} с")
+    return True
\ No newline at end of file
@@ -1,19 +1,311 @@
-import json
-import os
-
-def load_cache():
-    try:
-        if os.path.exists("cache.json"):
-            with open("cache.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Ошибка загрузки кэша: {e}")
-        return {}
-
-def save_cache(cache):
-    try:
-        with open("cache.json", "w", encoding="utf-8") as f:
-            json.dump(cache, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Ошибка сохранения кэша: {e}")
\ No newline at end of file
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from utils.metrics import CACHE_REQUESTS, cache_family
+from config import (
+    CACHE_DB_PATH, CACHE_RETENTION_DAYS, CACHE_PRUNE_INTERVAL,
+    CACHE_MEMORY_MAX_ENTRIES, CACHE_MEMORY_TTL, CACHE_FLUSH_INTERVAL, CACHE_FLUSH_BATCH,
+    ARTICLE_CACHE_MAX_ITEMS, ARTICLE_CACHE_MAX_BYTES
+)
+
+logger = logging.getLogger(__name__)
+
+LEGACY_CACHE_FILE = "cache.json"
+
+class CacheStore:
+    """Постоянный кэш на SQLite (WAL): каждая запись читается и пишется по своему ключу"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, timestamp TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "url TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL, "
+                "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, last_read REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_last_read ON articles (last_read)")
+            self._conn = conn
+            self._import_legacy_cache()
+            self._prune(timedelta(days=CACHE_RETENTION_DAYS))
+        return self._conn
+
+    def _import_legacy_cache(self):
+        """Однократно переносит записи из старого cache.json"""
+        if not os.path.exists(LEGACY_CACHE_FILE):
+            return
+        try:
+            with open(LEGACY_CACHE_FILE, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            rows = [
+                (key, entry.get("timestamp") or datetime.now().isoformat(), json.dumps(entry.get("data", []), ensure_ascii=False))
+                for key, entry in legacy.items()
+            ]
+            with self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO cache (key, timestamp, data) VALUES (?, ?, ?)", rows)
+            os.replace(LEGACY_CACHE_FILE, LEGACY_CACHE_FILE + ".bak")
+            logger.info(f"Перенесено {len(rows)} записей из {LEGACY_CACHE_FILE}")
+        except Exception as e:
+            logger.error(f"Ошибка переноса старого кэша: {e}")
+
+    def _prune(self, max_age):
+        """Удаляет записи старше max_age, чтобы база не росла бесконечно; возвращает число удалённых"""
+        cutoff = (datetime.now() - max_age).isoformat()
+        with self._conn:
+            return self._conn.execute("DELETE FROM cache WHERE timestamp < ?", (cutoff,)).rowcount
+
+    def prune(self, max_age=timedelta(days=CACHE_RETENTION_DAYS)):
+        """Очистка по сроку хранения для долго работающего процесса (вызывается периодически, вне цикла событий)"""
+        with self._lock:
+            self._connect()
+            return self._prune(max_age)
+
+    def get(self, key):
+        with self._lock:
+            row = self._connect().execute("SELECT timestamp, data FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"timestamp": row[0], "data": json.loads(row[1])}
+
+    def set(self, key, data, timestamp=None):
+        timestamp = timestamp or datetime.now().isoformat()
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            # Одна запись — одна транзакция: читатели видят либо старое, либо новое значение
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO cache (key, timestamp, data) VALUES (?, ?, ?)", (key, timestamp, payload))
+
+    def set_many(self, entries):
+        """Записывает пачку {key: {"timestamp", "data"}} одной транзакцией"""
+        rows = [(key, entry["timestamp"], json.dumps(entry["data"], ensure_ascii=False)) for key, entry in entries.items()]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO cache (key, timestamp, data) VALUES (?, ?, ?)", rows)
+
+    def get_article(self, url):
+        """Текст статьи из кэша с валидаторами; отмечает время чтения для LRU"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT content, etag, last_modified, fetched_at FROM articles WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE articles SET last_read = ? WHERE url = ?", (now, url))
+        return {"content": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def put_article(self, url, content, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO articles (url, content, size, etag, last_modified, fetched_at, last_read) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, content, len(content.encode("utf-8")), etag, last_modified, now, now)
+                )
+                self._evict_articles(conn)
+
+    def mark_article_fresh(self, url):
+        """Сайт ответил 304 — текст актуален, обновляем время проверки"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("UPDATE articles SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def _evict_articles(self, conn):
+        """Удаляет давно не читавшиеся статьи сверх лимитов по количеству и объёму"""
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM articles").fetchone()
+        if count <= ARTICLE_CACHE_MAX_ITEMS and total <= ARTICLE_CACHE_MAX_BYTES:
+            return
+        rows = conn.execute("SELECT url, size FROM articles ORDER BY last_read").fetchall()
+        evicted = []
+        for url, size in rows:
+            if count <= ARTICLE_CACHE_MAX_ITEMS and total <= ARTICLE_CACHE_MAX_BYTES:
+                break
+            evicted.append((url,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM articles WHERE url = ?", evicted)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class MemoryCache:
+    """Ограниченный LRU-кэш в памяти с TTL для каждой записи"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key):
+        item = self._entries.get(key)
+        if item is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry
+
+    def set(self, key, entry, ttl=None):
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def snapshot(self):
+        """Живые записи с оставшимся TTL — для тёплого старта"""
+        now = time.monotonic()
+        return [[key, expires_at - now, entry] for key, (expires_at, entry) in self._entries.items() if expires_at > now]
+
+    def restore(self, items):
+        for key, ttl, entry in items:
+            if ttl > 0:
+                self.set(key, entry, ttl)
+
+    def __len__(self):
+        return len(self._entries)
+
+cache_store = CacheStore(CACHE_DB_PATH)
+memory_cache = MemoryCache(CACHE_MEMORY_MAX_ENTRIES, CACHE_MEMORY_TTL)
+
+# Записи, ещё не сброшенные на диск (отложенная запись)
+_dirty = {}
+
+async def get_cache_entry(key):
+    """Читает одну запись кэша: сначала из памяти, затем с диска вне цикла событий"""
+    entry = memory_cache.get(key)
+    if entry is not None:
+        return entry
+    entry = _dirty.get(key)
+    if entry is not None:
+        return entry
+    try:
+        entry = await asyncio.to_thread(cache_store.get, key)
+    except Exception as e:
+        logger.error(f"Ошибка загрузки кэша: {e}")
+        return None
+    if entry is not None:
+        memory_cache.set(key, entry)
+    return entry
+
+async def get_fresh_data(key, max_age=timedelta(hours=24)):
+    """Данные записи, если она моложе max_age, иначе None"""
+    entry = await get_cache_entry(key)
+    if not entry:
+        CACHE_REQUESTS.inc(family=cache_family(key), result="miss")
+        return None
+    timestamp = entry.get("timestamp")
+    if timestamp and (datetime.now() - datetime.fromisoformat(timestamp)) < max_age:
+        CACHE_REQUESTS.inc(family=cache_family(key), result="hit")
+        return entry["data"]
+    CACHE_REQUESTS.inc(family=cache_family(key), result="stale")
+    return None
+
+async def get_stale_data(key):
+    """Данные записи независимо от возраста; None, если записи нет"""
+    entry = await get_cache_entry(key)
+    return entry["data"] if entry else None
+
+async def set_cache_entry(key, data):
+    """Сохраняет запись в памяти; на диск она попадёт при ближайшем сбросе"""
+    entry = {"timestamp": datetime.now().isoformat(), "data": data}
+    memory_cache.set(key, entry)
+    _dirty[key] = entry
+    if len(_dirty) >= CACHE_FLUSH_BATCH:
+        await flush_cache()
+
+async def flush_cache():
+    """Сбрасывает накопленные записи на диск одной транзакцией"""
+    if not _dirty:
+        return
+    batch = dict(_dirty)
+    try:
+        await asyncio.to_thread(cache_store.set_many, batch)
+    except Exception as e:
+        logger.error(f"Ошибка сохранения кэша: {e}")
+        return
+    for key, entry in batch.items():
+        # Запись могла обновиться, пока шёл сброс — её оставляем до следующего раза
+        if _dirty.get(key) is entry:
+            del _dirty[key]
+
+async def prune_cache():
+    """Удаляет с диска записи старше CACHE_RETENTION_DAYS (ключи поиска и страниц списков копятся без конца)"""
+    try:
+        removed = await asyncio.to_thread(cache_store.prune)
+    except Exception as e:
+        logger.error(f"Ошибка очистки кэша: {e}")
+        return
+    if removed:
+        logger.info("Из кэша удалено устаревших записей: %d", removed)
+
+async def run_cache_flusher():
+    """Фоновая задача: периодически сбрасывает кэш на диск и раз в CACHE_PRUNE_INTERVAL чистит устаревшие записи"""
+    last_prune = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(CACHE_FLUSH_INTERVAL)
+            await flush_cache()
+            if time.monotonic() - last_prune >= CACHE_PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                await prune_cache()
+    except asyncio.CancelledError:
+        await flush_cache()
+        raise
+
+async def get_cached_article(url):
+    """Статья из кэша текстов: {"content", "etag", "last_modified", "fetched_at"} или None"""
+    try:
+        return await asyncio.to_thread(cache_store.get_article, url)
+    except Exception as e:
+        logger.error(f"Ошибка чтения кэша статей: {e}")
+        return None
+
+async def save_cached_article(url, content, etag=None, last_modified=None):
+    try:
+        await asyncio.to_thread(cache_store.put_article, url, content, etag, last_modified)
+    except Exception as e:
+        logger.error(f"Ошибка сохранения кэша статей: {e}")
+
+async def mark_article_fresh(url):
+    try:
+        await asyncio.to_thread(cache_store.mark_article_fresh, url)
+    except Exception as e:
+        logger.error(f"Ошибка обновления кэша статей: {e}")
+
+def get_cache_stats():
+    """Счётчики кэша в памяти: попадания, промахи, вытеснения"""
+    return dict(memory_cache.stats, size=len(memory_cache), pending_writes=len(_dirty))
\ No newline at end of file
@@ -0,0 +1,321 @@
+import asyncio
+import html
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from aiogram import types
+from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from config import (
+    SUBSCRIPTIONS_DB_PATH, SUBSCRIPTIONS_BATCH, SUBSCRIPTIONS_MAX_ATTEMPTS, SUBSCRIPTIONS_MAX_ARTICLES,
+    SUBSCRIPTIONS_RETRY_BASE, SUBSCRIPTIONS_RETRY_MAX
+)
+from utils.outbound import priority, PRIORITY_LOW
+from context import app
+
+logger = logging.getLogger(__name__)
+
+class SubscriptionStore:
+    """Подписки на рубрики и темы, уже известные статьи и задания рассылки с прогрессом по каждому подписчику"""
+
+    def __init__(self, db_path=SUBSCRIPTIONS_DB_PATH):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    user_id INTEGER NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL, title TEXT NOT NULL, created REAL NOT NULL,
+                    PRIMARY KEY (user_id, kind, key)
+                );
+                CREATE INDEX IF NOT EXISTS subscriptions_feed ON subscriptions (kind, key);
+                CREATE TABLE IF NOT EXISTS seen (kind TEXT NOT NULL, key TEXT NOT NULL, url TEXT NOT NULL, PRIMARY KEY (kind, key, url));
+                CREATE TABLE IF NOT EXISTS feeds (kind TEXT NOT NULL, key TEXT NOT NULL, newest TEXT NOT NULL, PRIMARY KEY (kind, key));
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT NOT NULL, title TEXT NOT NULL,
+                    articles TEXT NOT NULL, created REAL NOT NULL, status TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0, sent INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS deliveries (
+                    job_id INTEGER NOT NULL, user_id INTEGER NOT NULL, status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL, next_attempt REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job_id, user_id)
+                );
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(deliveries)")]
+            if "next_attempt" not in columns:
+                # База, созданная до отложенных повторов
+                conn.execute("ALTER TABLE deliveries ADD COLUMN next_attempt REAL NOT NULL DEFAULT 0")
+            self._conn = conn
+        return self._conn
+
+    def subscribe(self, user_id, kind, key, title):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO subscriptions (user_id, kind, key, title, created) VALUES (?, ?, ?, ?, ?)",
+                (user_id, kind, key, title, time.time())
+            )
+
+    def unsubscribe(self, user_id, kind=None, key=None):
+        """Без kind/key снимает все подписки пользователя (например, если он заблокировал бота)"""
+        with self._lock, self._connect() as conn:
+            if kind is None:
+                conn.execute("DELETE FROM subscriptions WHERE user_id = ?", (user_id,))
+            else:
+                conn.execute("DELETE FROM subscriptions WHERE user_id = ? AND kind = ? AND key = ?", (user_id, kind, key))
+
+    def user_subscriptions(self, user_id):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT kind, key, title FROM subscriptions WHERE user_id = ? ORDER BY created", (user_id,)
+            ).fetchall()
+        return [{"kind": kind, "key": key, "title": title} for kind, key, title in rows]
+
+    def subscribed_feeds(self, kind):
+        """Ленты, на которые есть хотя бы одна подписка: {key: title}"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT key, MIN(title) FROM subscriptions WHERE kind = ? GROUP BY key", (kind,)
+            ).fetchall()
+        return dict(rows)
+
+    def register_articles(self, kind, key, title, articles):
+        """Запоминает статьи ленты; для новых при наличии подписчиков создаёт задание рассылки.
+        Первый просмотр ленты только запоминает статьи: иначе подписчики получили бы весь архив.
+        Новой считается незнакомая статья не старше самой свежей из известных: лента рубрики — это поиск
+        с порядком по релевантности, и старая статья, впервые попавшая в выдачу, рассылаться не должна.
+        Возвращает (новые статьи, job_id или None)."""
+        with self._lock, self._connect() as conn:
+            known = conn.execute("SELECT 1 FROM seen WHERE kind = ? AND key = ? LIMIT 1", (kind, key)).fetchone()
+            row = conn.execute("SELECT newest FROM feeds WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            newest = row[0] if row else None
+            urls = list(dict.fromkeys(article["url"] for article in articles if article.get("url")))
+            fresh_urls = set()
+            for url in urls:
+                if conn.execute("INSERT OR IGNORE INTO seen (kind, key, url) VALUES (?, ?, ?)", (kind, key, url)).rowcount:
+                    fresh_urls.add(url)
+            days = [day for day in map(_article_day, articles) if day]
+            if days and (newest is None or max(days) > newest):
+                conn.execute("INSERT OR REPLACE INTO feeds (kind, key, newest) VALUES (?, ?, ?)", (kind, key, max(days)))
+            if newest is not None:
+                # Без разобранной даты статья судится только по адресу
+                fresh_urls = {
+                    article["url"] for article in articles
+                    if article.get("url") in fresh_urls and (_article_day(article) or newest) >= newest
+                }
+            if not known or not fresh_urls:
+                return [], None
+            fresh = [article for article in articles if article.get("url") in fresh_urls]
+            fresh = list({article["url"]: article for article in fresh}.values())
+            # Задание и список получателей фиксируются в той же транзакции, что и «увиденные» статьи:
+            # после падения рассылка продолжится, а не потеряется и не задвоится
+            now = time.time()
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, key, title, articles, created, status) VALUES (?, ?, ?, ?, ?, 'pending')",
+                (kind, key, title, json.dumps(fresh[:SUBSCRIPTIONS_MAX_ARTICLES], ensure_ascii=False), now)
+            ).lastrowid
+            total = conn.execute(
+                "INSERT INTO deliveries (job_id, user_id, status, updated) "
+                "SELECT ?, user_id, 'pending', ? FROM subscriptions WHERE kind = ? AND key = ?",
+                (job_id, now, kind, key)
+            ).rowcount
+            if not total:
+                conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                return fresh, None
+            conn.execute("UPDATE jobs SET total = ? WHERE job_id = ?", (total, job_id))
+            return fresh, job_id
+
+    def pending_jobs(self):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT job_id, kind, key, title, articles FROM jobs WHERE status = 'pending' ORDER BY job_id"
+            ).fetchall()
+        return [
+            {"job_id": job_id, "kind": kind, "key": key, "title": title, "articles": json.loads(articles)}
+            for job_id, kind, key, title, articles in rows
+        ]
+
+    def pending_deliveries(self, job_id, limit):
+        """Получатели, которым пора отправлять: новые и те, у кого подошло время повтора"""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT user_id, attempts FROM deliveries WHERE job_id = ? AND status = 'pending' AND next_attempt <= ? LIMIT ?",
+                (job_id, time.time(), limit)
+            ).fetchall()
+
+    def next_retry(self, job_id):
+        """Время ближайшего отложенного повтора задания; None, если ждать больше некого"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MIN(next_attempt) FROM deliveries WHERE job_id = ? AND status = 'pending'", (job_id,)
+            ).fetchone()
+        return row[0]
+
+    def record_deliveries(self, job_id, results):
+        """results: [(user_id, status, attempts, next_attempt)]; обновляет прогресс задания одной транзакцией"""
+        now = time.time()
+        sent = sum(1 for _, status, _, _ in results if status == "sent")
+        failed = sum(1 for _, status, _, _ in results if status in ("failed", "blocked"))
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE deliveries SET status = ?, attempts = ?, updated = ?, next_attempt = ? WHERE job_id = ? AND user_id = ?",
+                [(status, attempts, now, next_attempt, job_id, user_id) for user_id, status, attempts, next_attempt in results]
+            )
+            conn.execute("UPDATE jobs SET sent = sent + ?, failed = failed + ? WHERE job_id = ?", (sent, failed, job_id))
+
+    def finish_job(self, job_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'done' WHERE job_id = ?", (job_id,))
+
+    def job_progress(self):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT job_id, title, total, sent, failed FROM jobs WHERE status = 'pending' ORDER BY job_id"
+            ).fetchall()
+        return [{"job_id": job_id, "title": title, "total": total, "sent": sent, "failed": failed} for job_id, title, total, sent, failed in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def _article_day(article):
+    """Дата статьи как ГГГГ-ММ-ДД (сравнивается строкой); None, если не разобрать"""
+    try:
+        return datetime.strptime(article.get("date") or "", "%d.%m.%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+subscription_store = SubscriptionStore()
+_wakeup = None
+
+async def subscribe(user_id, kind, key, title):
+    await asyncio.to_thread(subscription_store.subscribe, user_id, kind, key, title)
+
+async def unsubscribe(user_id, kind, key):
+    await asyncio.to_thread(subscription_store.unsubscribe, user_id, kind, key)
+
+async def get_user_subscriptions(user_id):
+    return await asyncio.to_thread(subscription_store.user_subscriptions, user_id)
+
+async def get_subscribed_feeds(kind):
+    return await asyncio.to_thread(subscription_store.subscribed_feeds, kind)
+
+async def notify_new_articles(kind, key, title, articles):
+    """Вызывается после загрузки ленты: новые статьи ставятся в рассылку подписчикам"""
+    if not articles:
+        return
+    try:
+        fresh, job_id = await asyncio.to_thread(subscription_store.register_articles, kind, key, title, articles)
+    except Exception as e:
+        logger.error(f"Ошибка учёта новых статей {kind} {key}: {e}")
+        return
+    if job_id is not None:
+        logger.info(f"Новых статей в '{title}': {len(fresh)}, создана рассылка {job_id}")
+        if _wakeup is not None:
+            _wakeup.set()
+
+def format_notification(job):
+    label = "рубрике" if job["kind"] == "rubrika" else "теме"
+    text = f"🔔 <b>Новые статьи в {label} «{html.escape(job['title'])}»</b>\n\n"
+    for i, article in enumerate(job["articles"]):
+        text += f"{i+1}. <a href=\"{html.escape(article['url'])}\">{html.escape(article['title'])}</a>\n"
+        if article.get("date"):
+            text += f"   📅 {article['date']}\n"
+    return text
+
+def get_notification_keyboard():
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        types.InlineKeyboardButton(text="🔔 Мои подписки", callback_data="subscriptions"),
+        types.InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")
+    )
+    return builder.as_markup()
+
+def retry_delay(attempts):
+    """Пауза перед повтором: растёт вдвое с каждой попыткой, со случайным сдвигом, чтобы повторы не шли разом"""
+    delay = min(SUBSCRIPTIONS_RETRY_MAX, SUBSCRIPTIONS_RETRY_BASE * 2 ** (attempts - 1))
+    return random.uniform(delay / 2, delay)
+
+async def _deliver(user_id, attempts, text, markup):
+    try:
+        await app.bot.send_message(user_id, text, parse_mode="HTML", reply_markup=markup, disable_web_page_preview=True)
+        return user_id, "sent", attempts + 1, 0
+    except TelegramForbiddenError:
+        # Пользователь заблокировал бота — подписки ему больше не нужны
+        await asyncio.to_thread(subscription_store.unsubscribe, user_id)
+        return user_id, "blocked", attempts + 1, 0
+    except TelegramBadRequest as e:
+        logger.warning(f"Не удалось отправить уведомление {user_id}: {e}")
+        return user_id, "failed", attempts + 1, 0
+    except Exception as e:
+        logger.warning(f"Ошибка отправки уведомления {user_id}: {e}")
+        if attempts + 1 >= SUBSCRIPTIONS_MAX_ATTEMPTS:
+            return user_id, "failed", attempts + 1, 0
+        # Временная ошибка: повтор откладывается, остальная рассылка идёт дальше
+        return user_id, "pending", attempts + 1, time.time() + retry_delay(attempts + 1)
+
+async def _deliver_and_record(job_id, user_id, attempts, text, markup):
+    # Результат пишется сразу после отправки: после падения повторно уйдут только неподтверждённые сообщения
+    result = await _deliver(user_id, attempts, text, markup)
+    await asyncio.to_thread(subscription_store.record_deliveries, job_id, [result])
+
+async def run_job(job):
+    """Рассылает задание пачками; прогресс по каждому подписчику хранится в базе, поэтому после падения рассылка продолжается.
+    Возвращает время ближайшего отложенного повтора или None, если задание завершено."""
+    text = format_notification(job)
+    markup = get_notification_keyboard()
+    while True:
+        batch = await asyncio.to_thread(subscription_store.pending_deliveries, job["job_id"], SUBSCRIPTIONS_BATCH)
+        if not batch:
+            break
+        # Низкий приоритет: ответы пользователям в очереди исходящих идут раньше рассылки
+        with priority(PRIORITY_LOW):
+            await asyncio.gather(*(_deliver_and_record(job["job_id"], user_id, attempts, text, markup) for user_id, attempts in batch))
+    retry_at = await asyncio.to_thread(subscription_store.next_retry, job["job_id"])
+    if retry_at is not None:
+        return retry_at
+    await asyncio.to_thread(subscription_store.finish_job, job["job_id"])
+    logger.info(f"Рассылка {job['job_id']} ('{job['title']}') завершена")
+    return None
+
+async def run_notifier():
+    """Фоновая задача: выполняет задания рассылки, включая незавершённые до перезапуска"""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    while True:
+        _wakeup.clear()
+        retries = []
+        try:
+            for job in await asyncio.to_thread(subscription_store.pending_jobs):
+                retry_at = await run_job(job)
+                if retry_at is not None:
+                    retries.append(retry_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка рассылки уведомлений: {e}")
+            await asyncio.sleep(5)
+            continue
+        if not retries:
+            await _wakeup.wait()
+            continue
+        # Отложенные повторы — не раньше их срока, новое задание будит раньше
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=max(0, min(retries) - time.time()))
+        except asyncio.TimeoutError:
+            pass
+
+async def get_subscription_stats():
+    """Незавершённые рассылки с прогрессом"""
+    return await asyncio.to_thread(subscription_store.job_progress)
\ No newline at end of file